@@ -43,11 +43,18 @@ class TokenBucket:
             n: tokens to consume
             timeout: optional maximum seconds to wait; raises TimeoutError if exceeded.
         """
-        start = time.monotonic()
+        deadline = None if timeout is None else time.monotonic() + timeout
         while True:
-            if self.non_blocking_try_acquire(n):
-                return
-            if timeout is not None and (time.monotonic() - start) > timeout:
-                raise TimeoutError(f"TokenBucket acquire timeout after {timeout}s")
-            # Sleep scaled to fill rate; minimum 10ms to avoid busy loop.
-            time.sleep(max(0.01, n / max(self.fill_rate, 1e-9) * 0.25))
+            with self._lock:
+                self._refill_locked()
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return
+                # Sleep exactly until the missing tokens are refilled instead of polling.
+                wait = (n - self._tokens) / max(self.fill_rate, 1e-9)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"TokenBucket acquire timeout after {timeout}s")
+                wait = min(wait, remaining)
+            time.sleep(wait)
@@ -2,12 +2,14 @@
 
 from .relevance_scorer import (
     calculate_relevance_score,
+    calculate_relevance_scores_batch,
     extract_domain_from_url,
     extract_filename_from_url,
 )
 
 __all__ = [
     "calculate_relevance_score",
+    "calculate_relevance_scores_batch",
     "extract_filename_from_url",
     "extract_domain_from_url",
 ]
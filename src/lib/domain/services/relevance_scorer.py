@@ -9,8 +9,9 @@ Calculates a 0.0-1.0 relevance score based on keyword matching in:
 
 from __future__ import annotations
 
+import functools
 import re
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from urllib.parse import urlparse
 
 # Weights for each scoring component
@@ -20,15 +21,22 @@ WEIGHT_CONTEXT = 0.2
 WEIGHT_DOMAIN = 0.1
 
 # Trusted domains for image content
-TRUSTED_DOMAINS = {
-    "wikimedia.org",
-    "wikipedia.org",
-    "pixabay.com",
-    "unsplash.com",
-    "pexels.com",
-    "flickr.com",
-    "imgur.com",
-}
+TRUSTED_DOMAINS = frozenset(
+    {
+        "wikimedia.org",
+        "wikipedia.org",
+        "pixabay.com",
+        "unsplash.com",
+        "pexels.com",
+        "flickr.com",
+        "imgur.com",
+    }
+)
+# Subdomain suffixes (".wikimedia.org", ...) checked by a single str.endswith call
+_TRUSTED_SUFFIXES = tuple("." + d for d in TRUSTED_DOMAINS)
+
+# Runs of word characters; Japanese kana/kanji stay together in one token
+_TOKEN_RE = re.compile(r"[\w\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF]+")
 
 
 def _tokenize(text: str) -> List[str]:
@@ -36,7 +44,7 @@ def _tokenize(text: str) -> List[str]:
     if not text:
         return []
     # Split on whitespace and punctuation, keep Japanese characters together
-    tokens = re.findall(r"[\w\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF]+", text.lower())
+    tokens = _TOKEN_RE.findall(text.casefold())
     return [t for t in tokens if len(t) > 1]  # Filter single chars
 
 
@@ -44,8 +52,9 @@ def _calculate_match_ratio(topic_tokens: List[str], text: str) -> float:
     """Calculate what fraction of topic tokens appear in text."""
     if not topic_tokens or not text:
         return 0.0
-    text_lower = text.lower()
-    matches = sum(1 for token in topic_tokens if token in text_lower)
+    # Substring (not token) membership so "富士山" matches "富士山の写真";
+    # map() keeps the per-token loop in C
+    matches = sum(map(text.casefold().__contains__, topic_tokens))
     return matches / len(topic_tokens)
 
 
@@ -53,10 +62,9 @@ def _score_domain(domain: Optional[str]) -> float:
     """Return 1.0 for trusted domains, 0.0 otherwise."""
     if not domain:
         return 0.0
-    domain_lower = domain.lower()
-    for trusted in TRUSTED_DOMAINS:
-        if domain_lower == trusted or domain_lower.endswith("." + trusted):
-            return 1.0
+    domain_folded = domain.casefold()
+    if domain_folded in TRUSTED_DOMAINS or domain_folded.endswith(_TRUSTED_SUFFIXES):
+        return 1.0
     return 0.0
 
 
@@ -86,12 +94,64 @@ def calculate_relevance_score(
     if not topic_tokens:
         return 0.0
 
-    # Calculate individual scores
-    alt_score = _calculate_match_ratio(topic_tokens, alt_text or "")
-    filename_score = _calculate_match_ratio(topic_tokens, filename or "")
-    context_score = _calculate_match_ratio(topic_tokens, context_text or "")
-    domain_score = _score_domain(domain)
+    return _score_with_tokens(topic_tokens, alt_text, filename, context_text, domain)
 
+
+def calculate_relevance_scores_batch(
+    topic: str,
+    alt_texts: Sequence[Optional[str]],
+    filenames: Sequence[Optional[str]],
+    context_texts: Sequence[Optional[str]],
+    domains: Sequence[Optional[str]],
+) -> List[float]:
+    """Calculate relevance scores for many images of the same topic.
+
+    Equivalent to calling calculate_relevance_score per image, but the topic
+    is tokenized only once, and context texts and domains (which repeat across
+    the images of one page) are scored once per distinct value. All sequences
+    must have the same length.
+
+    Returns:
+        Scores in input order, each between 0.0 and 1.0
+    """
+    if not topic or not topic.strip():
+        return [0.0] * len(alt_texts)
+
+    topic_tokens = _tokenize(topic)
+    if not topic_tokens:
+        return [0.0] * len(alt_texts)
+
+    context_scores = {c: _calculate_match_ratio(topic_tokens, c) if c else 0.0 for c in set(context_texts)}
+    domain_scores = {d: _score_domain(d) if d else 0.0 for d in set(domains)}
+    return [
+        _weighted_score(
+            _calculate_match_ratio(topic_tokens, alt_text) if alt_text else 0.0,
+            _calculate_match_ratio(topic_tokens, filename) if filename else 0.0,
+            context_scores[context_text],
+            domain_scores[domain],
+        )
+        for alt_text, filename, context_text, domain in zip(alt_texts, filenames, context_texts, domains, strict=True)
+    ]
+
+
+def _score_with_tokens(
+    topic_tokens: List[str],
+    alt_text: Optional[str],
+    filename: Optional[str],
+    context_text: Optional[str],
+    domain: Optional[str],
+) -> float:
+    """Weighted relevance score for pre-tokenized topic tokens."""
+    # Calculate individual scores (missing fields score 0 without a call)
+    alt_score = _calculate_match_ratio(topic_tokens, alt_text) if alt_text else 0.0
+    filename_score = _calculate_match_ratio(topic_tokens, filename) if filename else 0.0
+    context_score = _calculate_match_ratio(topic_tokens, context_text) if context_text else 0.0
+    domain_score = _score_domain(domain) if domain else 0.0
+    return _weighted_score(alt_score, filename_score, context_score, domain_score)
+
+
+def _weighted_score(alt_score: float, filename_score: float, context_score: float, domain_score: float) -> float:
+    """Combine per-field scores into the clamped 0.0-1.0 relevance score."""
     # Weighted sum
     total = (
         WEIGHT_ALT * alt_score
@@ -104,8 +164,9 @@ def calculate_relevance_score(
     return max(0.0, min(1.0, total))
 
 
+@functools.lru_cache(maxsize=4096)
 def extract_filename_from_url(url: str | None) -> Optional[str]:
-    """Extract filename from image URL."""
+    """Extract filename from image URL (cached; URLs are rescored across pages)."""
     if not url:
         return None
     try:
@@ -122,8 +183,9 @@ def extract_filename_from_url(url: str | None) -> Optional[str]:
         return None
 
 
+@functools.lru_cache(maxsize=4096)
 def extract_domain_from_url(url: str | None) -> Optional[str]:
-    """Extract domain from URL."""
+    """Extract domain from URL (cached; a page's images share a few hosts)."""
     if not url:
         return None
     try:
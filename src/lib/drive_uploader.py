@@ -285,7 +285,9 @@ class RcloneUploader(DriveUploader):
             )
 
         # Get list of files to upload
-        files = [f for f in os.listdir(local_dir) if os.path.isfile(os.path.join(local_dir, f))]
+        # scandir exposes the file type from the directory listing; no stat() per file
+        with os.scandir(local_dir) as it:
+            files = [e.name for e in it if e.is_file()]
 
         if not files:
             return (0, [])
@@ -47,20 +47,25 @@ With Google Drive upload (service account) - note: drive_uploader is keyword-onl
 
 from __future__ import annotations
 
+import atexit
+import functools
 import hashlib
 import logging
 import mimetypes
 import os
 import re
 import time
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
+from threading import Lock
 from typing import TYPE_CHECKING, Any, Callable, List, Optional
 from urllib import robotparser
-from urllib.parse import urlparse
+from urllib.parse import urljoin, urlparse
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
 
 if TYPE_CHECKING:
     from src.lib.drive_uploader import DriveUploader
@@ -90,8 +95,21 @@ DEFAULT_HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
 }
 
+# Shared session so page and image fetches reuse keep-alive connections.
+# Pool size covers the concurrent page fetches in topic discovery and the
+# default download_images_parallel worker count.
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+atexit.register(_SESSION.close)
+
 IMG_EXT_PATTERN = re.compile(r"\.(?:png|jpe?g|gif|webp|svg)(?:\?.*)?$", re.IGNORECASE)
 
+# Only <img> tags are needed when no surrounding context is extracted
+_IMG_ONLY = SoupStrainer("img")
+# Cheap pre-check: pages without any <img> tag skip HTML parsing entirely
+_IMG_TAG_RE = re.compile(r"<img\b", re.IGNORECASE)
+
 
 @dataclass
 class ScrapeResult:
@@ -101,11 +119,14 @@ class ScrapeResult:
     drive_file_ids: List[str]
 
 
-def _request_with_retry(url: str, retries: int = 3, backoff: float = 1.2) -> requests.Response:
+def _request_with_retry(
+    url: str, retries: int = 3, backoff: float = 1.2, session: Optional[requests.Session] = None
+) -> requests.Response:
+    http = session or _SESSION
     last_exc: Optional[Exception] = None
     for attempt in range(1, retries + 1):
         try:
-            resp = requests.get(url, headers=DEFAULT_HEADERS, timeout=15)
+            resp = http.get(url, headers=DEFAULT_HEADERS, timeout=15)
             resp.raise_for_status()
             return resp
         except Exception as e:  # broad for retry
@@ -129,23 +150,70 @@ def _normalize_url(src: str, base: str) -> str:
     if src.startswith("http://") or src.startswith("https://"):
         return src
     # relative path - use stdlib urljoin instead of requests.compat
-    from urllib.parse import urljoin
-
     return urljoin(base, src)
 
 
+# Parsed robots.txt per scheme://netloc, refetched after ROBOTS_CACHE_TTL seconds.
+# A None parser means every path on the host is allowed: either robots.txt was
+# unreachable (fail-open) or it has no Disallow rules, so no per-URL match is needed.
+# At most ROBOTS_CACHE_MAXSIZE hosts are kept; the least recently used one is evicted.
+ROBOTS_CACHE_TTL = 6 * 60 * 60
+ROBOTS_CACHE_MAXSIZE = 1024
+_robots_cache: OrderedDict[str, tuple[Optional[robotparser.RobotFileParser], float]] = OrderedDict()
+_robots_cache_lock = Lock()
+
+
+def _is_fully_permissive(rp: robotparser.RobotFileParser) -> bool:
+    """Return True if rp allows every path for every user agent."""
+    if rp.disallow_all:
+        return False
+    if rp.allow_all:
+        return True
+    if not rp.mtime():
+        # can_fetch() denies everything until robots.txt has been parsed
+        return False
+    entries = list(rp.entries)
+    if rp.default_entry is not None:
+        entries.append(rp.default_entry)
+    return all(line.allowance for entry in entries for line in entry.rulelines)
+
+
+def _get_robots(scheme: str, netloc: str) -> Optional[robotparser.RobotFileParser]:
+    """Return the cached robots.txt parser for a host, fetching it at most once per TTL."""
+    key = f"{scheme}://{netloc}"
+    now = time.monotonic()
+    with _robots_cache_lock:
+        cached = _robots_cache.get(key)
+        if cached is not None:
+            _robots_cache.move_to_end(key)
+    if cached is not None and now - cached[1] < ROBOTS_CACHE_TTL:
+        return cached[0]
+    # Fetch outside the lock so a slow host does not block other threads
+    parser: Optional[robotparser.RobotFileParser] = None
+    try:
+        rp = robotparser.RobotFileParser(f"{key}/robots.txt")
+        rp.read()
+        if not _is_fully_permissive(rp):
+            parser = rp
+    except Exception:
+        pass
+    with _robots_cache_lock:
+        _robots_cache[key] = (parser, now)
+        _robots_cache.move_to_end(key)
+        while len(_robots_cache) > ROBOTS_CACHE_MAXSIZE:
+            _robots_cache.popitem(last=False)
+    return parser
+
+
 def _robots_allowed(target_url: str, user_agent: str = DEFAULT_HEADERS["User-Agent"]) -> bool:
     """Return True if robots.txt allows fetching target_url. If robots.txt is
     unreachable, default to True (fail-open) to avoid false negatives.
     """
     try:
         parsed = urlparse(target_url)
-        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
-        rp = robotparser.RobotFileParser()
-        rp.set_url(robots_url)
-        rp.read()
+        rp = _get_robots(parsed.scheme, parsed.netloc)
         # If no rules present, can_fetch returns True by default
-        return rp.can_fetch(user_agent, target_url)
+        return rp is None or rp.can_fetch(user_agent, target_url)
     except Exception:
         return True
 
@@ -159,8 +227,18 @@ def robots_allowed(target_url: str, user_agent: str = DEFAULT_HEADERS["User-Agen
     return _robots_allowed(target_url, user_agent=user_agent)
 
 
+@functools.lru_cache(maxsize=4096)
+def _hash_url_16(url: str) -> str:
+    """Return the 16-hex-char SHA-256 prefix used as the saved filename stem.
+
+    Shared with topic_discovery's provenance index so both sides always agree;
+    cached because each downloaded URL is hashed again when the index is built.
+    """
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
 def _hash_name(url: str) -> str:
-    h = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+    h = _hash_url_16(url)
     ext = os.path.splitext(url.split("?")[0])[1] or ".img"
     return f"{h}{ext}"
 
@@ -169,9 +247,9 @@ def _ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
-def _download_image(url: str, dest_dir: str) -> Optional[str]:
+def _download_image(url: str, dest_dir: str, session: Optional[requests.Session] = None) -> Optional[str]:
     try:
-        r = _request_with_retry(url, retries=2)
+        r = _request_with_retry(url, retries=2, session=session)
         content_type = r.headers.get("Content-Type", "")
         # Determine extension
         ext = mimetypes.guess_extension(content_type.split(";")[0].strip()) or os.path.splitext(url.split("?")[0])[1]
@@ -234,6 +312,24 @@ def _drive_upload(drive_service, local_path: str, parent_folder_id: Optional[str
     return file_id
 
 
+def _img_sources(html: str) -> List[str]:
+    """Return stripped src/data-src/data-original values of every <img>, in page order.
+
+    Parses with a SoupStrainer so only <img> tags are turned into tree nodes;
+    the rest of the document is tokenized but never built.
+    """
+    if not _IMG_TAG_RE.search(html):
+        return []
+    sources: List[str] = []
+    for img in BeautifulSoup(html, "html.parser", parse_only=_IMG_ONLY).find_all("img"):
+        src = img.get("src") or img.get("data-src") or img.get("data-original")
+        if not src:
+            continue
+        src_val = src if isinstance(src, str) else str(src)
+        sources.append(src_val.strip())
+    return sources
+
+
 def scrape_images(
     url: str,
     output_dir: str,
@@ -278,15 +374,7 @@ def scrape_images(
     if respect_robots and not _robots_allowed(url):
         raise PermissionError(f"Blocked by robots.txt: {url}")
     response = _request_with_retry(url)
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    raw_sources: List[str] = []
-    for img in soup.find_all("img"):
-        src = img.get("src") or img.get("data-src") or img.get("data-original")
-        if not src:
-            continue
-        src_val = src if isinstance(src, str) else str(src)
-        raw_sources.append(src_val.strip())
+    raw_sources = _img_sources(response.text)
 
     # Deduplicate and normalize
     normalized: List[str] = []
@@ -350,14 +438,7 @@ def list_images(url: str, limit: Optional[int] = None, respect_robots: bool = Tr
     if respect_robots and not _robots_allowed(url):
         raise PermissionError(f"Blocked by robots.txt: {url}")
     response = _request_with_retry(url)
-    soup = BeautifulSoup(response.text, "html.parser")
-    raw_sources: List[str] = []
-    for img in soup.find_all("img"):
-        src = img.get("src") or img.get("data-src") or img.get("data-original")
-        if not src:
-            continue
-        src_val = src if isinstance(src, str) else str(src)
-        raw_sources.append(src_val.strip())
+    raw_sources = _img_sources(response.text)
 
     normalized: List[str] = []
     seen = set()
@@ -479,6 +560,8 @@ def list_images_with_metadata(
         raise PermissionError(f"Blocked by robots.txt: {url}")
 
     response = _request_with_retry(url)
+    if not _IMG_TAG_RE.search(response.text):
+        return []
     soup = BeautifulSoup(response.text, "html.parser")
 
     results: List[ImageMetadata] = []
@@ -517,6 +600,7 @@ def download_images_parallel(
     max_workers: int = 8,
     respect_robots: bool = True,
     progress_cb: Optional[Callable[[int, int], None]] = None,
+    session: Optional[requests.Session] = None,
 ) -> List[str]:
     """Parallel version of download_images with progress callback.
 
@@ -526,6 +610,8 @@ def download_images_parallel(
         max_workers: concurrency level.
         respect_robots: skip disallowed images.
         progress_cb: optional callback invoked as progress_cb(done_count, total).
+        session: HTTP session to download with (defaults to the shared module session,
+            so back-to-back calls reuse pooled keep-alive connections).
     Returns:
         List of saved file paths (order not guaranteed).
     """
@@ -538,7 +624,7 @@ def download_images_parallel(
         if respect_robots and not _robots_allowed(u):
             logger.warning(f"robots.txt disallows fetching image: {u}")
             return None
-        return _download_image(u, output_dir)
+        return _download_image(u, output_dir, session=session)
 
     with ThreadPoolExecutor(max_workers=max_workers) as ex:
         future_map = {ex.submit(_task, u): u for u in image_urls}
@@ -0,0 +1,80 @@
+"""JSON helpers shared by the library and the UIs.
+
+Uses orjson when it is installed and falls back to the standard library for
+what orjson rejects (NaN/Infinity input, integers beyond 64 bits) or would
+write differently (orjson writes non-finite floats as null, the stdlib as
+NaN/Infinity). Output is UTF-8 with non-ASCII characters left unescaped
+either way.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+from typing import Any
+
+# Optional fast JSON parser/serializer
+try:
+    import orjson  # ty: ignore[unresolved-import]
+
+    HAS_ORJSON = True
+except ImportError:
+    orjson: Any = None
+    HAS_ORJSON = False
+
+__all__ = ["HAS_ORJSON", "dump", "dumps", "dumps_bytes", "loads"]
+
+
+def _stdlib_dumps(obj: Any, indent: bool) -> str:
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _has_non_finite(obj: Any) -> bool:
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_non_finite(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(v) for v in obj)
+    return False
+
+
+def loads(data: str | bytes) -> Any:
+    """Parse JSON text or UTF-8 bytes."""
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            pass
+    return json.loads(data)
+
+
+def dumps_bytes(obj: Any, *, indent: bool = False) -> bytes:
+    """Serialize obj as UTF-8 JSON bytes: compact, or 2-space indented when indent is True."""
+    if HAS_ORJSON:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            data = orjson.dumps(obj, option=option)
+        except TypeError:
+            pass
+        else:
+            # orjson writes NaN/Infinity as null; only then is the walk for them needed
+            if b"null" not in data or not _has_non_finite(obj):
+                return data
+    return _stdlib_dumps(obj, indent).encode("utf-8")
+
+
+def dumps(obj: Any, *, indent: bool = False) -> str:
+    """Serialize obj as JSON text: compact, or 2-space indented when indent is True."""
+    if HAS_ORJSON:
+        return dumps_bytes(obj, indent=indent).decode("utf-8")
+    return _stdlib_dumps(obj, indent)
+
+
+def dump(path: str | os.PathLike[str], obj: Any, *, indent: bool = False) -> None:
+    """Write obj to path as UTF-8 JSON."""
+    with open(path, "wb") as f:
+        f.write(dumps_bytes(obj, indent=indent))
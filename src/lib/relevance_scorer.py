@@ -11,12 +11,14 @@ from .domain.services.relevance_scorer import (
     _score_domain,
     _tokenize,
     calculate_relevance_score,
+    calculate_relevance_scores_batch,
     extract_domain_from_url,
     extract_filename_from_url,
 )
 
 __all__ = [
     "calculate_relevance_score",
+    "calculate_relevance_scores_batch",
     "extract_filename_from_url",
     "extract_domain_from_url",
     "_tokenize",
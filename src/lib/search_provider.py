@@ -6,14 +6,18 @@ Supports DuckDuckGo via ddgs library with rate limiting and retry.
 
 from __future__ import annotations
 
+import atexit
+import functools
+import itertools
 import logging
+import threading
 import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from typing import Any, Callable, Optional
 from urllib.parse import urlparse
 
-from src.lib.domain.types import narrow_image_result_source, narrow_text_result_href
-
 logger = logging.getLogger(__name__)
 
 # Optional import for ddgs (formerly duckduckgo_search)
@@ -39,6 +43,26 @@ with warnings.catch_warnings():
             pass
 
 
+# Search workers are long-lived so each keeps its own DDGS client (DDGS thread safety is not
+# established) and reuses it across searches, keeping the cached engines' connections alive.
+# Concurrent searches never share a client, and the clients are closed at interpreter exit.
+_search_workers = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ddgs-search")
+_ddgs_local = threading.local()
+_ddgs_exit_stack = ExitStack()
+_ddgs_exit_lock = threading.Lock()
+atexit.register(_ddgs_exit_stack.close)
+
+
+def _ddgs_client() -> Any:
+    """Return the calling thread's DDGS client, creating it on first use."""
+    client = getattr(_ddgs_local, "client", None)
+    if client is None:
+        assert DDGS is not None  # Guaranteed by _HAS_DDGS check in callers
+        with _ddgs_exit_lock:
+            client = _ddgs_local.client = _ddgs_exit_stack.enter_context(DDGS())
+    return client
+
+
 # Rate limiter singleton (can be injected for testing)
 _rate_limiter: Optional[Callable[[], None]] = None
 
@@ -57,6 +81,13 @@ def _wait_rate_limit() -> None:
 
 def _is_valid_url(url: str) -> bool:
     """Check if a URL is valid and has http/https scheme."""
+    # Guard before the cached check: raw ddgs values may be unhashable
+    return isinstance(url, str) and _is_valid_url_cached(url)
+
+
+@functools.lru_cache(maxsize=8192)
+def _is_valid_url_cached(url: str) -> bool:
+    """Cached urlparse-based validation; search results repeat URLs across topics."""
     try:
         parsed = urlparse(url)
         return parsed.scheme in ("http", "https") and bool(parsed.netloc)
@@ -96,20 +127,21 @@ def _search_duckduckgo(topic: str, max_pages: int) -> list[str]:
     urls: list[str] = []
 
     def _do_search():
-        nonlocal urls
+        # A retry after a partial rate-limited run starts over instead of appending duplicates
+        urls.clear()
         _wait_rate_limit()
-        assert DDGS is not None  # Guaranteed by _HAS_DDGS check
-        with DDGS() as ddgs:
-            # Search for text results (pages containing images)
-            query = f"{topic} images"
-            results = list(ddgs.text(query, max_results=max_pages * 2))
-
-            for r in results:
-                if len(urls) >= max_pages:
-                    break
-                href = narrow_text_result_href(r)
-                if _is_valid_url(href):
-                    urls.append(href)
+        # Search for text results (pages containing images)
+        query = f"{topic} images"
+        max_results = max_pages * 2
+        _get = dict.get
+        # ddgs>=8 returns a list, so the early break only bounds local processing
+        for r in itertools.islice(_ddgs_client().text(query, max_results=max_results), max_results):
+            if len(urls) >= max_pages:
+                break
+            # Inlined narrow_text_result_href; _is_valid_url rejects non-str values
+            href = (_get(r, "href") or _get(r, "link") or "") if isinstance(r, dict) else ""
+            if _is_valid_url(href):
+                urls.append(href)
         return urls
 
     try:
@@ -127,22 +159,23 @@ def _search_duckduckgo_images(topic: str, max_pages: int) -> list[str]:
         logger.warning("ddgs not installed; returning empty results")
         return []
 
-    source_pages: set[str] = set()
+    # Insertion-ordered dict keeps search rank order while deduplicating
+    source_pages: dict[str, None] = {}
 
     def _do_search():
-        nonlocal source_pages
+        source_pages.clear()
         _wait_rate_limit()
-        assert DDGS is not None  # Guaranteed by _HAS_DDGS check
-        with DDGS() as ddgs:
-            results = list(ddgs.images(topic, max_results=max_pages * 5))
-
-            for r in results:
-                if len(source_pages) >= max_pages:
-                    break
-                # images() returns 'url' for image and 'source' for page
-                page_url = narrow_image_result_source(r)
-                if _is_valid_url(page_url) and page_url not in source_pages:
-                    source_pages.add(page_url)
+        max_results = max_pages * 5
+        _get = dict.get
+        # ddgs>=8 returns a list, so the early break only bounds local processing
+        for r in itertools.islice(_ddgs_client().images(topic, max_results=max_results), max_results):
+            if len(source_pages) >= max_pages:
+                break
+            # images() returns 'url' for image and 'source' for page
+            # Inlined narrow_image_result_source; _is_valid_url rejects non-str values
+            page_url = (_get(r, "source") or _get(r, "url") or "") if isinstance(r, dict) else ""
+            if _is_valid_url(page_url) and page_url not in source_pages:
+                source_pages[page_url] = None
         return source_pages
 
     try:
@@ -154,6 +187,27 @@ def _search_duckduckgo_images(topic: str, max_pages: int) -> list[str]:
     return list(source_pages)[:max_pages]
 
 
+def _search_pages_parallel(topic: str, max_pages: int) -> list[str]:
+    """Run image and text searches concurrently and merge them in rank order.
+
+    Image search results (source pages) come first; text results only fill
+    the remaining slots. The rate limiter is thread-safe, so both workers
+    share it; each worker uses its own DDGS client.
+    """
+    images_future = _search_workers.submit(_search_duckduckgo_images, topic, max_pages)
+    text_future = _search_workers.submit(_search_duckduckgo, topic, max_pages)
+    image_urls = images_future.result()
+    # Discard text results when image search already saturated max_pages
+    text_urls = text_future.result() if len(image_urls) < max_pages else []
+
+    merged = dict.fromkeys(image_urls)
+    for u in text_urls:
+        if len(merged) >= max_pages:
+            break
+        merged.setdefault(u)
+    return list(merged)
+
+
 def search_pages(topic: str, provider: str = "duckduckgo", max_pages: int = 20) -> list[str]:
     """Search for candidate pages containing images related to topic.
 
@@ -173,19 +227,7 @@ def search_pages(topic: str, provider: str = "duckduckgo", max_pages: int = 20)
     logger.info("search_pages.start topic=%s provider=%s max_pages=%d", topic, provider, max_pages)
 
     if provider == "duckduckgo":
-        # Try images search first (gets source pages directly)
-        urls = _search_duckduckgo_images(topic, max_pages)
-
-        # If images search returned few results, supplement with text search
-        if len(urls) < max_pages // 2:
-            text_urls = _search_duckduckgo(topic, max_pages - len(urls))
-            seen = set(urls)
-            for u in text_urls:
-                if u not in seen:
-                    urls.append(u)
-                    seen.add(u)
-                    if len(urls) >= max_pages:
-                        break
+        urls = _search_pages_parallel(topic, max_pages)
     else:
         logger.warning("unsupported provider %s; returning empty", provider)
         urls = []
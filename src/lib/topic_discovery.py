@@ -11,28 +11,27 @@ Responsibilities:
 
 from __future__ import annotations
 
-import json
+import functools
 import logging
+import operator
 import os
 import re
+import string
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
 from datetime import datetime, timezone
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Iterable, Iterator, Optional
 from urllib.parse import urlparse
 
-from pydantic import HttpUrl
+from pydantic import HttpUrl, TypeAdapter
 
-from . import search_provider
+from . import jsonio, search_provider
 from .domain.types import ProvenanceRecordDict, QueryLogDict
-
-# Runtime import with availability check for PIL
-try:
-    from PIL import Image
-
-    HAS_PIL = True
-except ImportError:
-    Image: Any = None
-    HAS_PIL = False
 from .image_scraper import (
+    ImageMetadata,
+    _hash_url_16,
     download_images_parallel,
     list_images_with_metadata,
     robots_allowed,
@@ -45,17 +44,63 @@ from .models_discovery import (
 )
 from .rate_limit import TokenBucket
 from .relevance_scorer import (
-    calculate_relevance_score,
+    calculate_relevance_scores_batch,
     extract_domain_from_url,
     extract_filename_from_url,
 )
 
+# Runtime import with availability check for PIL
+try:
+    from PIL import Image
+
+    HAS_PIL = True
+except ImportError:
+    Image: Any = None
+    HAS_PIL = False
+
+# Optional header-only size probe (reads a few bytes instead of opening via PIL)
+try:
+    import imagesize  # ty: ignore[unresolved-import]
+
+    HAS_IMAGESIZE = True
+except ImportError:
+    imagesize: Any = None
+    HAS_IMAGESIZE = False
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_PROVIDER = "duckduckgo"
 
 _DISCOVERY_LOG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "discovery_logs"))
 
+
+# Single background writer: query logs are written in submission order without
+# blocking discover_topic. Pending writes are flushed at interpreter exit.
+_query_log_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-log")
+
+
+def _write_query_log(topic: str, path: str, payload: QueryLogDict) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        jsonio.dump(path, payload, indent=True)
+        logger.info("query_log.written path=%s", path)
+    except Exception as e:
+        logger.warning("query_log.write_failed topic=%s err=%s", topic, e)
+
+
+@functools.lru_cache(maxsize=1)
+def _utc_date_str(day: int) -> str:
+    """Return the YYYYMMDD string for a UTC day number (seconds since epoch // 86400)."""
+    return datetime.fromtimestamp(day * 86400, tz=timezone.utc).strftime("%Y%m%d")
+
+
+# Reusable HttpUrl validator: validate each URL string once, then build entries
+# with model_construct() so pydantic does not re-validate them field by field
+_HTTP_URL_ADAPTER: TypeAdapter[HttpUrl] = TypeAdapter(HttpUrl)
+
+# Result pages fetched ahead concurrently while earlier pages are being scored
+_MAX_CONCURRENT_PAGES = 4
+
 # Rate limiter for search provider (max 2 requests per second)
 _discovery_rate_limiter = TokenBucket(capacity=2, fill_rate=2.0)
 
@@ -69,13 +114,86 @@ def _apply_rate_limit() -> None:
 search_provider.set_rate_limiter(_apply_rate_limit)
 
 
+# ASCII fast path for _slugify_topic: disallowed characters map to a space in one C-level pass
+_SLUG_ASCII_ALLOWED = frozenset(string.ascii_lowercase + string.digits + "-_" + string.whitespace)
+_SLUG_ASCII_TABLE = str.maketrans({chr(i): chr(i) if chr(i) in _SLUG_ASCII_ALLOWED else " " for i in range(128)})
+_SLUG_DISALLOWED_RE = re.compile(r"[^a-z0-9\-\_\sぁ-んァ-ヶ一-龥]")
+_SLUG_WHITESPACE_RE = re.compile(r"\s+")
+
+
 def _slugify_topic(topic: str) -> str:
     s = topic.strip().lower()
-    s = re.sub(r"[^a-z0-9\-\_\sぁ-んァ-ヶ一-龥]", " ", s)
-    s = re.sub(r"\s+", "_", s)
+    if s.isascii():
+        s = s.translate(_SLUG_ASCII_TABLE)
+    else:
+        s = _SLUG_DISALLOWED_RE.sub(" ", s)
+    s = _SLUG_WHITESPACE_RE.sub("_", s)
     return s[:60] if s else "topic"
 
 
+def _write_provenance_index(path: str, records: Iterable[ProvenanceRecordDict], meta: dict[str, Any]) -> int:
+    """Stream provenance_index.json to disk one record at a time.
+
+    Writes the same document as jsonio.dump(path, {"entries": [...], "total": n, **meta}, indent=True)
+    without holding the full record list in memory. Returns the record count.
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{\n  "entries": [')
+        for record in records:
+            f.write(",\n    " if count else "\n    ")
+            f.write(jsonio.dumps(record, indent=True).replace("\n", "\n    "))
+            count += 1
+        f.write("\n  ]" if count else "]")
+        for key, value in {"total": count, **meta}.items():
+            value_json = jsonio.dumps(value, indent=True).replace("\n", "\n  ")
+            f.write(f",\n  {jsonio.dumps(key)}: {value_json}")
+        f.write("\n}")
+    return count
+
+
+def _iter_page_images(page_urls: list[str]) -> Iterator[tuple[str, Optional[list[ImageMetadata]]]]:
+    """Yield (page, image metadata) in search-rank order, fetching pages ahead concurrently.
+
+    Pages disallowed by robots.txt or failing to load yield None. At most
+    _MAX_CONCURRENT_PAGES pages are in flight, so closing the iterator early
+    (limit reached) wastes only a bounded number of fetches. While the caller
+    processes one page, the following pages are already being fetched.
+    """
+    pages = iter(page_urls)
+    pending: deque[tuple[str, Optional[Future[list[ImageMetadata]]]]] = deque()
+    ex = ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_PAGES)
+
+    def _submit_next() -> None:
+        # Disallowed pages take no fetch slot: keep going until one fetch is in flight
+        for page in pages:
+            if not robots_allowed(page):
+                logger.warning("robots page disallow: %s", page)
+                pending.append((page, None))
+                continue
+            # Use metadata-aware extraction for relevance scoring
+            pending.append((page, ex.submit(list_images_with_metadata, page, limit=None, respect_robots=True)))
+            return
+
+    try:
+        for _ in range(_MAX_CONCURRENT_PAGES):
+            _submit_next()
+        while pending:
+            page, future = pending.popleft()
+            image_metas = None
+            if future is not None:
+                # Refill the freed slot before waiting on this page
+                _submit_next()
+                try:
+                    image_metas = future.result()
+                except Exception as e:
+                    logger.warning("list_images.failed page=%s err=%s", page, e)
+            yield page, image_metas
+    finally:
+        # Closed early: drop queued fetches and return without joining the ones in flight
+        ex.shutdown(wait=False, cancel_futures=True)
+
+
 def discover_topic(topic: str, limit: int = 50) -> PreviewResult:
     """Discover images for a topic using a search provider and return a preview.
 
@@ -98,49 +216,58 @@ def discover_topic(topic: str, limit: int = 50) -> PreviewResult:
         page_urls = []
 
     images_collected: list[ProvenanceEntry] = []
+    # Validated image URLs already collected; the same image often appears on several result pages
+    seen_image_urls: set[str] = set()
+    # One discovery timestamp shared by every entry of this query
+    discovered_at = datetime.now(timezone.utc)
     pages_considered = 0
-    for page in page_urls:
-        if limit and len(images_collected) >= limit:
-            break
-        pages_considered += 1
-        if not robots_allowed(page):
-            logger.warning("robots page disallow: %s", page)
-            continue
-        try:
-            # Use metadata-aware extraction for relevance scoring
-            image_metas = list_images_with_metadata(page, limit=None, respect_robots=True)
-        except Exception as e:
-            logger.warning("list_images.failed page=%s err=%s", page, e)
-            continue
-        for meta in image_metas:
+    with closing(_iter_page_images(page_urls)) as page_results:
+        for page, image_metas in page_results:
             if limit and len(images_collected) >= limit:
                 break
-            # Calculate relevance score
-            image_url_str = str(meta.url)
-            filename = extract_filename_from_url(image_url_str)
-            domain = extract_domain_from_url(image_url_str)
-            score = calculate_relevance_score(
-                topic=topic,
-                alt_text=meta.alt,
-                filename=filename,
-                context_text=meta.context,
-                domain=domain,
+            pages_considered += 1
+            if image_metas is None:
+                continue
+            page_url = _HTTP_URL_ADAPTER.validate_python(page)
+            # Collect this page's new images first, then score them in one batch
+            new_metas: list[tuple[ImageMetadata, HttpUrl, str]] = []
+            for meta in image_metas:
+                if limit and len(images_collected) + len(new_metas) >= limit:
+                    break
+                # Key on the normalized URL so spellings like an upper-case host count as one image
+                image_url = _HTTP_URL_ADAPTER.validate_python(meta.url)
+                image_url_str = str(image_url)
+                if image_url_str in seen_image_urls:
+                    continue
+                seen_image_urls.add(image_url_str)
+                new_metas.append((meta, image_url, image_url_str))
+            if not new_metas:
+                continue
+            filenames = [extract_filename_from_url(url) for _, _, url in new_metas]
+            scores = calculate_relevance_scores_batch(
+                topic,
+                [meta.alt for meta, _, _ in new_metas],
+                filenames,
+                [meta.context for meta, _, _ in new_metas],
+                [extract_domain_from_url(url) for _, _, url in new_metas],
             )
-            images_collected.append(
-                ProvenanceEntry(
+            images_collected.extend(
+                ProvenanceEntry.model_construct(
                     topic=topic,
-                    source_page_url=HttpUrl(page),
-                    image_url=HttpUrl(meta.url),
+                    source_page_url=page_url,
+                    image_url=image_url,
                     discovery_method="SERP",
+                    timestamp=discovered_at,
                     relevance_score=score,
                     alt_text=meta.alt,
                     filename=filename,
                     context_text=meta.context,
                 )
+                for (meta, image_url, _), filename, score in zip(new_metas, filenames, scores, strict=True)
             )
 
-    # Sort by relevance score (highest first)
-    images_collected.sort(key=lambda e: e.relevance_score, reverse=True)
+    # Sort by relevance score (highest first); the collection loop already capped the list at limit
+    images_collected.sort(key=operator.attrgetter("relevance_score"), reverse=True)
 
     query_log = QueryLogEntry(
         topic=topic,
@@ -150,26 +277,19 @@ def discover_topic(topic: str, limit: int = 50) -> PreviewResult:
         image_count=len(images_collected),
     )
 
-    # 2) Write deterministic query log
-    try:
-        os.makedirs(_DISCOVERY_LOG_DIR, exist_ok=True)
-        ts = datetime.now(timezone.utc).strftime("%Y%m%d")
-        fn = f"{ts}_{_slugify_topic(topic)}.json"
-        path = os.path.join(_DISCOVERY_LOG_DIR, fn)
-        payload: QueryLogDict = {
-            "topic": topic,
-            "provider": DEFAULT_PROVIDER,
-            "query": topic,
-            "timestamp": query_log.timestamp.isoformat(),
-            "page_count": pages_considered,
-            "image_count": len(images_collected),
-            "pages": page_urls,
-        }
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
-        logger.info("query_log.written path=%s", path)
-    except Exception as e:
-        logger.warning("query_log.write_failed topic=%s err=%s", topic, e)
+    # 2) Write deterministic query log (in the background; the preview does not depend on it)
+    ts = _utc_date_str(int(time.time() // 86400))
+    fn = f"{ts}_{_slugify_topic(topic)}.json"
+    payload: QueryLogDict = {
+        "topic": topic,
+        "provider": DEFAULT_PROVIDER,
+        "query": topic,
+        "timestamp": query_log.timestamp.isoformat(),
+        "page_count": pages_considered,
+        "image_count": len(images_collected),
+        "pages": page_urls,
+    }
+    _query_log_writer.submit(_write_query_log, topic, os.path.join(_DISCOVERY_LOG_DIR, fn), payload)
 
     result = PreviewResult(
         topic=topic,
@@ -187,6 +307,31 @@ def discover_topic(topic: str, limit: int = 50) -> PreviewResult:
 # ---------------------------------------------------------------------------
 
 
+def _domain_matches(domain: str, domains: frozenset[str]) -> bool:
+    """Return True if domain equals, or is a subdomain of, any entry in domains.
+
+    Probes the set once per parent domain ("a.b.com" -> "b.com" -> "com"),
+    so cost depends on the number of labels, not on the size of the list.
+    """
+    while True:
+        if domain in domains:
+            return True
+        _, sep, domain = domain.partition(".")
+        if not sep:
+            return False
+
+
+def _domain_rejection(domain: str, allow: Optional[frozenset[str]], deny: Optional[frozenset[str]]) -> Optional[str]:
+    """Return why domain is filtered out ("domain_not_allowed"/"domain_denied"), or None to keep it."""
+    # Domain allow list (whitelist)
+    if allow and not _domain_matches(domain, allow):
+        return "domain_not_allowed"
+    # Domain deny list (blacklist)
+    if deny and _domain_matches(domain, deny):
+        return "domain_denied"
+    return None
+
+
 def filter_entries(
     entries: list[ProvenanceEntry],
     download_filter: Optional[DownloadFilter] = None,
@@ -202,39 +347,63 @@ def filter_entries(
     """
     if not download_filter:
         return entries
+    return [entry for entry, _ in _filter_entries_with_urls(entries, download_filter)]
 
-    filtered: list[ProvenanceEntry] = []
-    for entry in entries:
-        image_url = str(entry.image_url)
-        parsed = urlparse(image_url)
-        domain = parsed.netloc.lower()
 
-        # Domain allow list (whitelist)
-        if download_filter.allow_domains:
-            allowed = any(
-                domain == d.lower() or domain.endswith("." + d.lower()) for d in download_filter.allow_domains
-            )
-            if not allowed:
-                logger.debug("filter.domain_not_allowed url=%s domain=%s", image_url, domain)
-                continue
+def _filter_entries_with_urls(
+    entries: list[ProvenanceEntry],
+    download_filter: Optional[DownloadFilter],
+) -> list[tuple[ProvenanceEntry, str]]:
+    """filter_entries() that also returns each entry's image URL string for reuse downstream."""
+    if not download_filter:
+        return [(entry, str(entry.image_url)) for entry in entries]
+
+    urls = [str(entry.image_url) for entry in entries]
+    verdicts = _domain_verdicts(urls, download_filter)
+
+    # Note: Resolution filtering (min_width, min_height) requires fetching image headers
+    # or downloading. For efficiency, we skip resolution check at filter stage and
+    # apply it during download if needed.
+    filtered: list[tuple[ProvenanceEntry, str]] = []
+    for entry, image_url, (domain, reason) in zip(entries, urls, verdicts, strict=True):
+        if reason:
+            logger.debug("filter.%s url=%s domain=%s", reason, image_url, domain)
+            continue
+        filtered.append((entry, image_url))
 
-        # Domain deny list (blacklist)
-        if download_filter.deny_domains:
-            denied = any(domain == d.lower() or domain.endswith("." + d.lower()) for d in download_filter.deny_domains)
-            if denied:
-                logger.debug("filter.domain_denied url=%s domain=%s", image_url, domain)
-                continue
+    logger.info("filter_entries input=%d output=%d", len(entries), len(filtered))
+    return filtered
 
-        # Note: Resolution filtering (min_width, min_height) requires fetching image headers
-        # or downloading. For efficiency, we skip resolution check at filter stage and
-        # apply it during download if needed.
 
-        filtered.append(entry)
+def filter_urls(urls: list[str], download_filter: Optional[DownloadFilter] = None) -> list[str]:
+    """Apply the domain allow/deny lists of download_filter to plain image URLs.
 
-    logger.info("filter_entries input=%d output=%d", len(entries), len(filtered))
+    URL-mode counterpart of filter_entries for callers without provenance entries.
+    """
+    if not download_filter or not (download_filter.allow_domains or download_filter.deny_domains):
+        return urls
+    filtered: list[str] = []
+    for url, (domain, reason) in zip(urls, _domain_verdicts(urls, download_filter), strict=True):
+        if reason:
+            logger.debug("filter.%s url=%s domain=%s", reason, url, domain)
+            continue
+        filtered.append(url)
+    logger.info("filter_urls input=%d output=%d", len(urls), len(filtered))
     return filtered
 
 
+def _domain_verdicts(urls: list[str], download_filter: DownloadFilter) -> list[tuple[str, Optional[str]]]:
+    """Return (domain, rejection reason or None) for each URL."""
+    # Lowercase the domain lists once; matching is set-based so large blocklists stay cheap
+    allow = frozenset(d.lower() for d in download_filter.allow_domains) if download_filter.allow_domains else None
+    deny = frozenset(d.lower() for d in download_filter.deny_domains) if download_filter.deny_domains else None
+
+    # Decide each distinct domain once: discovered images usually share a handful of hosts
+    domains = [urlparse(url).netloc.lower() for url in urls]
+    rejections = {domain: _domain_rejection(domain, allow, deny) for domain in set(domains)}
+    return [(domain, rejections[domain]) for domain in domains]
+
+
 def _check_image_resolution(filepath: str, min_width: Optional[int], min_height: Optional[int]) -> bool:
     """Check if image meets minimum resolution requirements.
 
@@ -246,38 +415,53 @@ def _check_image_resolution(filepath: str, min_width: Optional[int], min_height:
     Returns:
         True if image meets requirements, False otherwise.
     """
-    if not HAS_PIL:
-        logger.warning("PIL not available, skipping resolution check for %s", filepath)
+    if not HAS_IMAGESIZE and not HAS_PIL:
+        logger.warning("PIL/imagesize not available, skipping resolution check for %s", filepath)
         return True
 
     if min_width is None and min_height is None:
         return True
 
     try:
-        assert Image is not None  # Guaranteed by HAS_PIL check above
-        with Image.open(filepath) as img:
-            width, height = img.size
-            if min_width is not None and width < min_width:
-                logger.debug(
-                    "resolution.reject width=%d < min_width=%d file=%s",
-                    width,
-                    min_width,
-                    filepath,
-                )
-                return False
-            if min_height is not None and height < min_height:
-                logger.debug(
-                    "resolution.reject height=%d < min_height=%d file=%s",
-                    height,
-                    min_height,
-                    filepath,
-                )
-                return False
-            return True
+        width, height = _probe_image_size(filepath)
     except Exception as e:
         logger.warning("resolution.check_failed file=%s err=%s", filepath, e)
         return True  # Keep file on error (conservative approach)
 
+    if min_width is not None and width < min_width:
+        logger.debug(
+            "resolution.reject width=%d < min_width=%d file=%s",
+            width,
+            min_width,
+            filepath,
+        )
+        return False
+    if min_height is not None and height < min_height:
+        logger.debug(
+            "resolution.reject height=%d < min_height=%d file=%s",
+            height,
+            min_height,
+            filepath,
+        )
+        return False
+    return True
+
+
+def _probe_image_size(filepath: str) -> tuple[int, int]:
+    """Return (width, height), reading only the image header when imagesize is installed.
+
+    Falls back to PIL for formats imagesize cannot parse (it reports -1, -1).
+    """
+    if HAS_IMAGESIZE:
+        width, height = imagesize.get(filepath)
+        if width >= 0 and height >= 0:
+            return width, height
+    if not HAS_PIL:
+        raise ValueError("unsupported image format and PIL not available")
+    assert Image is not None  # Guaranteed by HAS_PIL check above
+    with Image.open(filepath) as img:
+        return img.size
+
 
 def download_selected(
     entries: list[ProvenanceEntry],
@@ -302,19 +486,18 @@ def download_selected(
     Returns:
         Tuple of (list of saved file paths, path to provenance_index.json or None).
     """
-    # Apply domain filters
-    filtered_entries = filter_entries(entries, download_filter)
+    # Apply domain filters (keeping each entry's URL string for the passes below)
+    filtered_entries = _filter_entries_with_urls(entries, download_filter)
     if not filtered_entries:
         logger.warning("download_selected: no entries after filtering")
         if write_provenance_index:
             os.makedirs(output_dir, exist_ok=True)
             index_path = os.path.join(output_dir, "provenance_index.json")
-            with open(index_path, "w", encoding="utf-8") as f:
-                json.dump({"entries": [], "total": 0}, f, ensure_ascii=False, indent=2)
+            jsonio.dump(index_path, {"entries": [], "total": 0}, indent=True)
             return [], index_path
         return [], None
 
-    image_urls = [str(e.image_url) for e in filtered_entries]
+    image_urls = [url for _, url in filtered_entries]
 
     # Download images
     saved_files = download_images_parallel(
@@ -330,18 +513,22 @@ def download_selected(
     min_height = download_filter.min_height if download_filter else None
     if min_width is not None or min_height is not None:
         files_before = len(saved_files)
-        filtered_files = []
-        for filepath in saved_files:
+
+        def _keep_or_remove(filepath: str) -> bool:
             if _check_image_resolution(filepath, min_width, min_height):
-                filtered_files.append(filepath)
-            else:
-                # Remove file that doesn't meet resolution requirements
-                try:
-                    os.remove(filepath)
-                    logger.info("resolution.removed file=%s", filepath)
-                except OSError as e:
-                    logger.warning("resolution.remove_failed file=%s err=%s", filepath, e)
-        saved_files = filtered_files
+                return True
+            # Remove file that doesn't meet resolution requirements
+            try:
+                os.remove(filepath)
+                logger.info("resolution.removed file=%s", filepath)
+            except OSError as e:
+                logger.warning("resolution.remove_failed file=%s err=%s", filepath, e)
+            return False
+
+        # Header reads and removals are I/O bound; check files in parallel
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            keep = list(ex.map(_keep_or_remove, saved_files))
+        saved_files = [p for p, k in zip(saved_files, keep, strict=True) if k]
         logger.info(
             "resolution_filter applied=%d removed=%d",
             files_before,
@@ -354,44 +541,43 @@ def download_selected(
     # Build provenance index mapping filename -> provenance
 
     # Clean Architecture: 実際に保存されたファイルから逆マッピングして正確なファイル名を取得
-    url_to_entry = {str(e.image_url): e for e in filtered_entries}
-
-    # URL hash -> URL のマッピングを作成（堅牢な逆参照のため）
-    import hashlib
-
-    url_hash_to_url = {hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]: url for url in image_urls}
-
-    provenance_records: list[ProvenanceRecordDict] = []
-    for saved_path in saved_files:
-        filename = os.path.basename(saved_path)
-        # ファイル名から拡張子を除いたハッシュ部分を取得
-        file_hash = os.path.splitext(filename)[0]
-
-        # ハッシュから元のURLを取得
-        original_url = url_hash_to_url.get(file_hash)
-        if not original_url:
-            logger.warning("provenance: hash not found for file=%s", filename)
-            continue
+    # URL hash -> (URL, entry) のマッピングを1パスで作成（堅牢な逆参照のため）
+    url_hash_to_entry = {_hash_url_16(url): (url, entry) for entry, url in filtered_entries}
+
+    # Entries from one discovery share a timestamp; format each distinct one once
+    iso_timestamps: dict[datetime, str] = {}
+
+    def _iter_records() -> Iterator[ProvenanceRecordDict]:
+        for saved_path in saved_files:
+            filename = os.path.basename(saved_path)
+            # ファイル名から拡張子を除いたハッシュ部分を取得
+            file_hash = os.path.splitext(filename)[0]
+
+            # ハッシュから元のURLとエントリを取得
+            found = url_hash_to_entry.get(file_hash)
+            if not found:
+                logger.warning("provenance: hash not found for file=%s", filename)
+                continue
 
-        entry = url_to_entry.get(original_url)
-        if entry:
+            original_url, entry = found
             record: ProvenanceRecordDict = {
                 "filename": filename,
-                "image_url": str(entry.image_url),
+                "image_url": original_url,
                 "source_page_url": str(entry.source_page_url),
                 "topic": entry.topic,
                 "discovery_method": entry.discovery_method,
             }
             if entry.timestamp:
-                record["timestamp"] = entry.timestamp.isoformat()
-            provenance_records.append(record)
+                iso_ts = iso_timestamps.get(entry.timestamp)
+                if iso_ts is None:
+                    iso_ts = iso_timestamps[entry.timestamp] = entry.timestamp.isoformat()
+                record["timestamp"] = iso_ts
+            yield record
 
-    # Write provenance_index.json
+    # Write provenance_index.json (records are streamed, not collected into a list)
     os.makedirs(output_dir, exist_ok=True)
     index_path = os.path.join(output_dir, "provenance_index.json")
-    index_data = {
-        "entries": provenance_records,
-        "total": len(provenance_records),
+    index_meta = {
         "filter_applied": {
             "allow_domains": download_filter.allow_domains if download_filter else None,
             "deny_domains": download_filter.deny_domains if download_filter else None,
@@ -402,12 +588,11 @@ def download_selected(
         else None,
         "generated_at": datetime.now(timezone.utc).isoformat(),
     }
-    with open(index_path, "w", encoding="utf-8") as f:
-        json.dump(index_data, f, ensure_ascii=False, indent=2)
+    record_count = _write_provenance_index(index_path, _iter_records(), index_meta)
     logger.info(
         "provenance_index.written path=%s entries=%d",
         index_path,
-        len(provenance_records),
+        record_count,
     )
 
     return saved_files, index_path
@@ -1,14 +1,39 @@
 from __future__ import annotations
 
+import codecs
 import json
 import os
+import re
 from pathlib import Path
-from typing import Optional
+from typing import Any, Mapping, Optional
 from urllib.parse import urlencode
 
+from src.lib import jsonio
 from src.lib.domain.types import UIConfig
 
 SENSITIVE_KEYS = ("auth", "token", "secret", "key", "cookie", "password")
+_SENSITIVE_RE = re.compile("|".join(map(re.escape, SENSITIVE_KEYS)), re.IGNORECASE)
+# Characters a JSON document can start with (after whitespace)
+_JSON_FIRST_CHARS = frozenset('{["-0123456789tfnNI')
+
+
+def parse_json_text(text: str) -> tuple[bool, Optional[str], Any]:
+    """Validate and parse JSON text in one pass. Empty string is valid and parses to None.
+
+    Returns (ok, error_message, value).
+    """
+    stripped = text.strip() if text else ""
+    if not stripped:
+        return True, None, None
+    # Reject obviously broken input (the usual state while typing) without running the parser;
+    # the error is the one json.loads would raise at that character
+    if stripped[0] not in _JSON_FIRST_CHARS:
+        err = json.JSONDecodeError("Expecting value", text, len(text) - len(text.lstrip(" \t\n\r")))
+        return False, str(err), None
+    try:
+        return True, None, jsonio.loads(text)
+    except Exception as e:  # pragma: no cover - message content not critical
+        return False, str(e), None
 
 
 def validate_json_text(text: str) -> tuple[bool, Optional[str]]:
@@ -16,45 +41,36 @@ def validate_json_text(text: str) -> tuple[bool, Optional[str]]:
 
     Returns (ok, error_message).
     """
-    if not text or not text.strip():
-        return True, None
-    try:
-        json.loads(text)
-        return True, None
-    except Exception as e:  # pragma: no cover - message content not critical
-        return False, str(e)
+    ok, err, _ = parse_json_text(text)
+    return ok, err
 
 
-def mask_headers(headers: dict[str, str] | None) -> dict[str, str]:
+def mask_headers(headers: Mapping[str, str] | None) -> dict[str, str]:
     """Return a masked copy of headers values for sensitive keys.
 
     Keys containing SENSITIVE_KEYS (case-insensitive) will have value replaced with '***'.
+    The input mapping is never modified, so read-only mappings are accepted.
     """
-    masked: dict[str, str] = {}
-    for k, v in (headers or {}).items():
-        if any(tok in k.lower() for tok in SENSITIVE_KEYS):
-            masked[k] = "***"
-        else:
-            masked[k] = v
-    return masked
+    return {k: ("***" if _SENSITIVE_RE.search(k) else v) for k, v in (headers or {}).items()}
 
 
 def build_full_url(base_url: str, path: str, query: dict[str, object] | None) -> str:
     path = path if path.startswith("/") else f"/{path}"
     # Ensure base has no trailing slash duplication
     base = base_url.rstrip("/")
+    if not query:
+        return base + path
+    # Plain str values need no casting; urlencode them as-is
+    if all(isinstance(v, str) for v in query.values()):
+        return "".join((base, path, "?", urlencode(query)))
     # Cast query values to str and allow lists via doseq
-    if query:
-        q_items: dict[str, object] = {}
-        for k, v in query.items():
-            if isinstance(v, (list, tuple)):
-                q_items[k] = [str(x) for x in v]
-            else:
-                q_items[k] = str(v)
-        q = f"?{urlencode(q_items, doseq=True)}"
-    else:
-        q = ""
-    return f"{base}{path}{q}"
+    q_items: dict[str, object] = {}
+    for k, v in query.items():
+        if isinstance(v, (list, tuple)):
+            q_items[k] = [str(x) for x in v]
+        else:
+            q_items[k] = str(v)
+    return "".join((base, path, "?", urlencode(q_items, doseq=True)))
 
 
 def _config_dir() -> Path:
@@ -70,6 +86,14 @@ def _config_path() -> Path:
     return _config_dir().joinpath("ui_config.json")
 
 
+def config_mtime_ns() -> int:
+    """Return the config file's mtime in ns (0 if missing), for cheap change detection."""
+    try:
+        return _config_path().stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
 def load_config() -> UIConfig:
     """Load UI configuration from disk.
 
@@ -80,7 +104,7 @@ def load_config() -> UIConfig:
     if not p.exists():
         return {}
     try:
-        data = json.loads(p.read_text(encoding="utf-8"))
+        data = jsonio.loads(p.read_bytes())
         if not isinstance(data, dict):
             return {}
         # Return as UIConfig (type annotation for known fields)
@@ -91,15 +115,54 @@ def load_config() -> UIConfig:
 
 
 def save_config(cfg: UIConfig) -> None:
+    """Atomically persist UI configuration; a no-op if the file already has this content."""
     d = _config_dir()
     d.mkdir(parents=True, exist_ok=True)
     p = _config_path()
+    new_bytes = jsonio.dumps_bytes(cfg)
+    try:
+        if p.read_bytes() == new_bytes:
+            return
+    except OSError:
+        pass
     tmp = p.with_suffix(".tmp")
-    tmp.write_text(json.dumps(cfg, ensure_ascii=False, indent=2), encoding="utf-8")
-    tmp.replace(p)
+    with open(tmp, "wb") as f:
+        f.write(new_bytes)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, p)
+    _fsync_dir(d)
 
 
-def summarize_response(status: int, duration_ms: int, text: str, content_type: Optional[str]) -> dict:
+def _fsync_dir(d: Path) -> None:
+    """Flush the directory entry so the rename survives a crash (POSIX only)."""
+    try:
+        fd = os.open(d, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def summarize_response(
+    status: int,
+    duration_ms: int,
+    body: str | bytes,
+    content_type: Optional[str],
+    encoding: Optional[str] = None,
+) -> dict:
+    """Summarize a response for display.
+
+    body may be raw bytes (e.g. resp.content); it is decoded with encoding
+    (default UTF-8) and the preview is cut at a character count, never inside a
+    character. Only a head long enough for the preview is decoded, so large
+    responses are never fully decoded here. An unknown charset falls back to
+    UTF-8 instead of failing.
+    """
     ct_lower = content_type.lower() if content_type else ""
     if "json" in ct_lower:
         body_type = "json"
@@ -108,7 +171,20 @@ def summarize_response(status: int, duration_ms: int, text: str, content_type: O
     else:
         body_type = "other"
     preview_limit = 8000
-    preview = text if len(text) <= preview_limit else text[:preview_limit] + "\n... (truncated)"
+    if isinstance(body, bytes):
+        # Up to 4 bytes per character; the incremental decoder holds back a sequence cut at the end
+        head = body[: preview_limit * 4]
+        try:
+            decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        except (LookupError, TypeError):
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        text = decoder.decode(head, final=len(head) == len(body))
+        truncated = len(head) < len(body)
+    else:
+        text, truncated = body, False
+    preview = text[:preview_limit]
+    if truncated or len(text) > preview_limit:
+        preview += "\n... (truncated)"
     return {
         "status": status,
         "duration_ms": duration_ms,
@@ -4,9 +4,11 @@ import json
 import sys
 import time
 from pathlib import Path
+from typing import Any, Optional
 
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
 
 # Ensure repository root is importable when run via Streamlit
 _THIS_FILE = Path(__file__).resolve()
@@ -16,19 +18,43 @@ if str(_REPO_ROOT) not in sys.path:
 
 from src.lib.ui_helpers import (  # noqa: E402
     build_full_url,
+    config_mtime_ns,
     load_config,
     mask_headers,
+    parse_json_text,
     save_config,
     summarize_response,
-    validate_json_text,
 )
 
 st.set_page_config(page_title="image-saver API UI", layout="wide")
 
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _parse_json_input(text: str) -> tuple[bool, Optional[str], Any]:
+    """Parse a JSON input once per distinct text; Streamlit reruns the script on every interaction."""
+    return parse_json_text(text)
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _load_config_cached(mtime_ns: int) -> dict:
+    """Read the persisted config only when the file's mtime changes."""
+    return dict(load_config())
+
+
+@st.cache_resource
+def _http_session() -> requests.Session:
+    """Pooled session shared across reruns so repeated sends reuse keep-alive connections."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 st.title("image-saver API リクエストUI")
 
 # Load persisted config
-cfg = load_config() or {}
+cfg = _load_config_cached(config_mtime_ns()) or {}
 base_url = st.text_input("ベースURL", value=cfg.get("base_url", "http://localhost:8000"))
 common_headers_text = st.text_area(
     "共通ヘッダー(JSON)", value=json.dumps(cfg.get("common_headers", {}), ensure_ascii=False)
@@ -45,11 +71,11 @@ with col2:
 
 body_text = st.text_area("本文(JSON)", value="", height=160)
 
-# Validate JSON inputs
-ok_body, err_body = validate_json_text(body_text)
-ok_q, err_q = validate_json_text(query_text)
-ok_h, err_h = validate_json_text(headers_text)
-ok_ch, err_ch = validate_json_text(common_headers_text)
+# Validate JSON inputs (parsed values are reused by the handlers below)
+ok_body, err_body, body_data = _parse_json_input(body_text)
+ok_q, err_q, query_data = _parse_json_input(query_text)
+ok_h, err_h, headers_data = _parse_json_input(headers_text)
+ok_ch, err_ch, common_headers_data = _parse_json_input(common_headers_text)
 
 errors = []
 if not ok_body:
@@ -68,18 +94,26 @@ colA, colB = st.columns([1, 1])
 with colA:
     if st.button("送信", disabled=bool(errors)):
         try:
-            query = json.loads(query_text) if query_text.strip() else {}
-            headers = json.loads(headers_text) if headers_text.strip() else {}
-            common_headers = json.loads(common_headers_text) if common_headers_text.strip() else {}
+            query = query_data or {}
+            headers = headers_data or {}
+            common_headers = common_headers_data or {}
             all_headers = {**common_headers, **headers}
 
             url = build_full_url(base_url, path, query)
-            data = json.loads(body_text) if body_text.strip() else None
+            data = body_data
             start = time.time()
-            resp = requests.request(method=method, url=url, headers=all_headers or None, json=data, timeout=timeout)
+            resp = _http_session().request(
+                method=method, url=url, headers=all_headers or None, json=data, timeout=timeout
+            )
             duration_ms = int((time.time() - start) * 1000)
 
-            summary = summarize_response(resp.status_code, duration_ms, resp.text, resp.headers.get("Content-Type"))
+            summary = summarize_response(
+                resp.status_code,
+                duration_ms,
+                resp.content,
+                resp.headers.get("Content-Type"),
+                encoding=resp.encoding or resp.apparent_encoding,
+            )
 
             st.subheader("結果")
             st.json(summary)
@@ -98,17 +132,19 @@ with colB:
         try:
             cfg = {
                 "base_url": base_url,
-                "common_headers": json.loads(common_headers_text) if common_headers_text.strip() else {},
+                "common_headers": common_headers_data or {},
                 "timeout": int(timeout),
             }
             save_config(cfg)  # ty: ignore[invalid-argument-type]
+            _load_config_cached.clear()
             st.success("設定を保存しました")
         except Exception as e:
             st.error(f"設定保存に失敗しました: {e}")
 
 # Show masked preview of headers
-try:
-    masked = mask_headers(json.loads(common_headers_text) if common_headers_text.strip() else {})
-    st.caption(f"共通ヘッダー（マスク表示）: {masked}")
-except Exception:
-    pass
+if ok_ch:
+    try:
+        masked = mask_headers(common_headers_data or {})
+        st.caption(f"共通ヘッダー（マスク表示）: {masked}")
+    except Exception:
+        pass
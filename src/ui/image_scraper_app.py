@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import bisect
 import json
+import operator
+import os
 import sys
+import tempfile
+import zipfile
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, List, Optional, Sequence
 
+import pandas as pd
 import streamlit as st
 
 # Ensure repository root is importable when run via Streamlit
@@ -14,22 +20,23 @@ if str(_REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(_REPO_ROOT))
 
 from src.lib import image_scraper as scraper  # noqa: E402
+from src.lib import jsonio  # noqa: E402
 from src.lib.drive_uploader import RcloneUploader  # noqa: E402
-from src.lib.models_discovery import DownloadFilter, ProvenanceEntry  # noqa: E402
-from src.lib.topic_discovery import discover_topic, download_selected  # noqa: E402
+from src.lib.models_discovery import DownloadFilter, PreviewResult, ProvenanceEntry  # noqa: E402
+from src.lib.topic_discovery import discover_topic, download_selected, filter_urls  # noqa: E402
 
 # --- Google Drive履歴管理 ---
 GDRIVE_HISTORY_FILE = Path.home() / ".image_saver_gdrive_history.json"
 MAX_HISTORY = 10
 
 
+@st.cache_data(ttl=60, show_spinner=False)
 def load_gdrive_history() -> list[str]:
     """履歴ファイルからGoogle Driveパス履歴を読み込む"""
     if GDRIVE_HISTORY_FILE.exists():
         try:
-            with open(GDRIVE_HISTORY_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return data.get("paths", [])[:MAX_HISTORY]
+            data = jsonio.loads(GDRIVE_HISTORY_FILE.read_bytes())
+            return data.get("paths", [])[:MAX_HISTORY]
         except (json.JSONDecodeError, OSError):
             pass
     return []
@@ -44,10 +51,158 @@ def save_gdrive_history(new_path: str) -> None:
     history.insert(0, new_path)
     history = history[:MAX_HISTORY]
     try:
-        with open(GDRIVE_HISTORY_FILE, "w", encoding="utf-8") as f:
-            json.dump({"paths": history}, f, ensure_ascii=False, indent=2)
+        jsonio.dump(GDRIVE_HISTORY_FILE, {"paths": history}, indent=True)
     except OSError:
         pass
+    else:
+        load_gdrive_history.clear()
+
+
+# 既に圧縮済みの画像形式はdeflateしても縮まないため無圧縮で格納する
+_PRECOMPRESSED_SUFFIXES = frozenset({".jpg", ".jpeg", ".png", ".webp", ".gif"})
+
+
+def write_zip(paths: list[str], dest: str) -> None:
+    """保存済み画像をZIPファイルにまとめる（ファイルはディスクからディスクへストリームする）"""
+    if all(Path(p).suffix.lower() in _PRECOMPRESSED_SUFFIXES for p in paths):
+        compression = zipfile.ZIP_STORED
+    else:
+        compression = zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(dest, mode="w", compression=compression) as zf:
+        for p in paths:
+            zf.write(p, arcname=Path(p).name)
+
+
+def _discard_session_zip() -> None:
+    """セッションの一時ZIPがあれば削除し、キャッシュからも外す"""
+    _, cached_path = st.session_state.pop("zip_cache", None) or (None, None)
+    if cached_path:
+        try:
+            os.remove(cached_path)
+        except OSError:
+            pass
+
+
+def _session_zip_path(files: tuple[tuple[str, int, int], ...]) -> str:
+    """(path, mtime_ns, size) が同じならセッションの一時ZIPを再利用し、変わったら古いZIPを消して作り直す。
+
+    ZIP本体はメモリに保持せず一時ファイルに書き出し、セッションにはパスだけを持つ（1セッション1ファイル）。
+    """
+    cached_key, cached_path = st.session_state.get("zip_cache") or (None, None)
+    if cached_key == files and cached_path and os.path.exists(cached_path):
+        return cached_path
+    _discard_session_zip()
+    fd, zip_path = tempfile.mkstemp(prefix="images_download_", suffix=".zip")
+    os.close(fd)
+    try:
+        write_zip([p for p, _, _ in files], zip_path)
+    except OSError:
+        os.remove(zip_path)
+        raise
+    st.session_state["zip_cache"] = (files, zip_path)
+    return zip_path
+
+
+def _zip_cache_key(paths: list[str]) -> tuple[tuple[str, int, int], ...]:
+    key = []
+    for p in paths:
+        stat = Path(p).stat()
+        key.append((p, stat.st_mtime_ns, stat.st_size))
+    return tuple(key)
+
+
+def _basename(url: str) -> str:
+    """URLの末尾セグメント（クエリ除去）。Path(url).nameよりPurePathを生成しない分軽い"""
+    return url.rsplit("/", 1)[-1].split("?", 1)[0] or url
+
+
+def _relevance_badge(entry: Optional[ProvenanceEntry]) -> str:
+    """トピックモードの関連度表示（URLモードは空文字）"""
+    if entry is None:
+        return ""
+    score = entry.relevance_score
+    icon = "🟢" if score >= 0.6 else "🟡" if score >= 0.3 else "🔴"
+    return f"{icon} {entry.get_relevance_label()} ({score:.2f})"
+
+
+@st.fragment
+def _render_preview_grid(preview_urls: Sequence[str], page_indices: list[int], badges: Sequence[str]) -> None:
+    """サムネイルと選択列を1つのdata_editorで描画する。
+
+    画像ごとのcheckboxウィジェットを並べる代わりに1ウィジェットにまとめ、
+    フラグメントなので選択操作ではページ全体ではなくこの表だけが再実行される。
+    """
+    selected_mask: bytearray = st.session_state.setdefault("selected_mask", bytearray(len(preview_urls)))
+    page_slice = [preview_urls[i] for i in page_indices]
+    rows = pd.DataFrame(
+        {
+            "選択": [bool(selected_mask[i]) for i in page_indices],
+            # ImageColumnはURLをブラウザが直接取得し、表は表示中の行だけを描画するため
+            # 画面外のサムネイルは取得されない（遅延読み込み）。
+            # サーバー側でbytesを先読みすると全画像がWebSocket経由になり遅くなるため行わない。
+            "画像": page_slice,
+            "ファイル名": [_basename(u) for u in page_slice],
+            "関連度": [badges[i] for i in page_indices],
+        }
+    )
+    edited = st.data_editor(
+        rows,
+        key=f"sel_editor_{hash(tuple(page_slice))}",
+        hide_index=True,
+        column_config={
+            "選択": st.column_config.CheckboxColumn("選択"),
+            "画像": st.column_config.ImageColumn("画像", width="small"),
+        },
+        disabled=["画像", "ファイル名", "関連度"],
+    )
+    for i, checked in zip(page_indices, edited["選択"], strict=True):
+        selected_mask[i] = 1 if checked else 0
+
+
+@st.cache_data(ttl=600, max_entries=32, show_spinner=False)
+def _cached_list_images(page_url: str, limit: Optional[int], respect_robots: bool) -> list[str]:
+    """同じURL・条件での再プレビューはネットワークに出ずキャッシュから返す"""
+    return scraper.list_images(page_url, limit=limit, respect_robots=respect_robots)
+
+
+@st.cache_data(ttl=600, max_entries=32, show_spinner=False)
+def _cached_discover_topic(topic: str, limit: int) -> PreviewResult:
+    """同じトピック・件数での再探索はキャッシュから返す"""
+    return discover_topic(topic, limit=limit)
+
+
+def _parse_domain_list(text: str) -> list[str]:
+    """カンマ区切りのドメイン入力を小文字のリストに変換する"""
+    return [d for d in (part.strip().lower() for part in text.split(",")) if d]
+
+
+@st.cache_resource(ttl=300, show_spinner=False)
+def _get_gdrive_uploader() -> tuple[RcloneUploader, bool]:
+    """rcloneの設定確認（サブプロセス起動）をリランごとに行わず、結果を数分間使い回す"""
+    uploader = RcloneUploader("gdrive")
+    return uploader, uploader.is_available()
+
+
+def _store_preview(urls: Iterable[str], entries: Optional[List[ProvenanceEntry]]) -> tuple[str, ...]:
+    """プレビュー結果をセッションに保存する。URLはここで一度だけstrに揃え、重複は順序を保って取り除く。
+
+    URL列は不変のtupleで持ち、URL→エントリの参照はdictで定数時間にする。
+    """
+    urls = tuple(dict.fromkeys(map(str, urls)))
+    st.session_state["preview_urls"] = urls
+    st.session_state.pop("filter_key", None)
+    st.session_state.pop("sel_sig", None)
+    st.session_state["preview_urls_lower"] = [u.lower() for u in urls]
+    # 選択状態はURLの集合ではなく preview_urls の位置ごとの 0/1 で持つ
+    st.session_state["selected_mask"] = bytearray(len(urls))
+    st.session_state["provenance_entries"] = entries
+    url_to_entry = {str(e.image_url): e for e in entries} if entries else {}
+    st.session_state["url_to_entry"] = url_to_entry
+    # 関連度バッジは描画のたびではなく取り込み時に位置ごとに一度だけ作る
+    st.session_state["relevance_badges"] = tuple(_relevance_badge(url_to_entry.get(u)) for u in urls)
+    # 関連度の符号反転リスト（昇順）。しきい値以上の件数を bisect で O(log N) で求める
+    st.session_state["neg_relevance_scores"] = [-e.relevance_score for e in entries] if entries else None
+    return urls
 
 
 st.set_page_config(page_title="image-saver | 画像スクレイパー", layout="centered")
@@ -107,8 +262,12 @@ with col_r4:
 
 if clear_sel:
     st.session_state.pop("preview_urls", None)
-    st.session_state.pop("selected", None)
+    st.session_state.pop("preview_urls_lower", None)
+    st.session_state.pop("selected_mask", None)
     st.session_state.pop("provenance_entries", None)
+    st.session_state.pop("url_to_entry", None)
+    st.session_state.pop("neg_relevance_scores", None)
+    st.session_state.pop("relevance_badges", None)
 
 if run_preview:
     if not url.strip():
@@ -117,10 +276,8 @@ if run_preview:
         with st.spinner("画像URLを取得中..."):
             try:
                 lim: Optional[int] = None if limit == 0 else int(limit)
-                urls = scraper.list_images(url.strip(), limit=lim, respect_robots=respect_robots)
-                st.session_state["preview_urls"] = urls
-                st.session_state["selected"] = set()
-                st.session_state["provenance_entries"] = None  # URL mode has no provenance
+                urls = _cached_list_images(url.strip(), lim, respect_robots)
+                urls = _store_preview(urls, None)  # URL mode has no provenance
                 st.success(f"検出: {len(urls)} 枚の画像候補 (URL)")
             except PermissionError as e:
                 st.warning(f"robots.txt によりブロックされました: {e}")
@@ -134,34 +291,52 @@ if run_topic:
         with st.spinner("トピックから探索中..."):
             try:
                 lim: Optional[int] = None if limit == 0 else int(limit)
-                preview = discover_topic(topic.strip(), limit=lim or 50)
-                st.session_state["preview_urls"] = [str(e.image_url) for e in preview.entries]
-                st.session_state["selected"] = set()
-                st.session_state["provenance_entries"] = preview.entries  # Store for US2
+                preview = _cached_discover_topic(topic.strip(), lim or 50)
+                # Store for US2 (best-first, so the relevance filter can cut a prefix)
+                entries = sorted(preview.entries, key=operator.attrgetter("relevance_score"), reverse=True)
+                _store_preview([str(e.image_url) for e in entries], entries)
                 st.success(f"検出: {preview.total_images} 枚の画像候補 (トピック: {topic})")
             except Exception as e:
                 st.error(f"失敗しました: {e}")
 
-preview_urls = st.session_state.get("preview_urls", [])
-selected: set[str] = st.session_state.get("selected", set())
+preview_urls: Sequence[str] = st.session_state.get("preview_urls", ())
+selected_mask: bytearray = st.session_state.get("selected_mask") or bytearray()
+if len(selected_mask) != len(preview_urls):
+    selected_mask = bytearray(len(preview_urls))
+    st.session_state["selected_mask"] = selected_mask
 provenance_entries: Optional[List[ProvenanceEntry]] = st.session_state.get("provenance_entries", None)
 
-# Build URL to entry mapping for relevance display
-url_to_entry: dict[str, ProvenanceEntry] = {}
-if provenance_entries:
-    url_to_entry = {str(e.image_url): e for e in provenance_entries}
+# URL to entry mapping for relevance display (built once in _store_preview)
+url_to_entry: Optional[dict[str, ProvenanceEntry]] = st.session_state.get("url_to_entry")
+if url_to_entry is None:
+    url_to_entry = {str(e.image_url): e for e in provenance_entries or []}
+
+# Apply relevance filter (topic mode only): entries are stored best-first, so the
+# positions that pass form a prefix of preview_urls found by bisection
+visible = len(preview_urls)
+if provenance_entries and min_relevance_score > 0:
+    neg_scores: Optional[list[float]] = st.session_state.get("neg_relevance_scores")
+    if neg_scores is None or len(neg_scores) != len(preview_urls):
+        neg_scores = sorted(-e.relevance_score for e in url_to_entry.values())
+    visible = bisect.bisect_right(neg_scores, -min_relevance_score)
 
 # Apply search filter
 if search_term.strip():
-    filtered = [u for u in preview_urls if search_term.lower() in str(u).lower()]
+    needle = search_term.lower()
+    preview_urls_lower = st.session_state.get("preview_urls_lower")
+    if preview_urls_lower is None or len(preview_urls_lower) != len(preview_urls):
+        preview_urls_lower = [u.lower() for u in preview_urls]
+        st.session_state["preview_urls_lower"] = preview_urls_lower
+    # ページ送りなどフィルタ条件が変わらないリランでは前回の結果を使い回す
+    filter_key = (needle, visible, id(preview_urls))
+    if st.session_state.get("filter_key") == filter_key:
+        filtered: Sequence[int] = st.session_state["filtered"]
+    else:
+        filtered = [i for i in range(visible) if needle in preview_urls_lower[i]]
+        st.session_state["filter_key"] = filter_key
+        st.session_state["filtered"] = filtered
 else:
-    filtered = preview_urls
-
-# Apply relevance filter (topic mode only)
-if provenance_entries and min_relevance_score > 0:
-    filtered = [
-        u for u in filtered if url_to_entry.get(u, None) and url_to_entry[u].relevance_score >= min_relevance_score
-    ]
+    filtered = range(visible)
 
 # Pagination state
 total = len(filtered)
@@ -177,45 +352,26 @@ with col_p2:
 st.session_state["page_index"] = page_index
 start = page_index * page_size
 end = start + page_size
-page_slice = filtered[start:end]
+page_indices = list(filtered[start:end])
 
 if preview_urls:
     st.subheader("プレビュー（選択可能）")
-    # Select all toggle
-    if select_all_toggle:
-        for u in page_slice:
-            selected.add(str(u))
-    else:
-        # If toggled off, remove only those in page_slice (do not clear global manual selections on other pages)
-        for u in page_slice:
-            u_str = str(u)
-            if u_str in selected and f"sel_{preview_urls.index(u)}" not in st.session_state:
-                # keep manual boxes; rely on user unchecking for removal
-                pass
-    cols = st.columns(5)
-    for idx_global, u in enumerate(page_slice):
-        col = cols[idx_global % 5]
-        u_str = str(u)
-        with col:
-            st.image(u_str, caption=Path(u_str).name, width="stretch")
-            # Show relevance badge for topic mode
-            entry = url_to_entry.get(u_str)
-            if entry:
-                score = entry.relevance_score
-                label = entry.get_relevance_label()
-                if score >= 0.6:
-                    st.success(f"🟢 {label} ({score:.2f})")
-                elif score >= 0.3:
-                    st.warning(f"🟡 {label} ({score:.2f})")
-                else:
-                    st.error(f"🔴 {label} ({score:.2f})")
-            key = f"sel_{preview_urls.index(u)}"
-            checked = st.checkbox("選択", key=key, value=(u_str in selected))
-            if checked:
-                selected.add(u_str)
-            else:
-                selected.discard(u_str)
-    st.session_state["selected"] = selected
+    # Select all toggle (toggling off keeps manual selections; rely on user unchecking for removal)
+    # 同じページ・同じ条件のリランでは反映済みなので再適用しない（全選択中の手動解除も保たれる）
+    sel_sig = (page_index, select_all_toggle, search_term.strip().lower(), visible, id(preview_urls))
+    if select_all_toggle and st.session_state.get("sel_sig") != sel_sig:
+        if isinstance(filtered, range):
+            # 検索なしならページは連続した位置なので一括スライス代入で済む
+            selected_mask[start : start + len(page_indices)] = b"\x01" * len(page_indices)
+        else:
+            for i in page_indices:
+                selected_mask[i] = 1
+    st.session_state["sel_sig"] = sel_sig
+    relevance_badges: Optional[Sequence[str]] = st.session_state.get("relevance_badges")
+    if relevance_badges is None or len(relevance_badges) != len(preview_urls):
+        relevance_badges = tuple(_relevance_badge(url_to_entry.get(u)) for u in preview_urls)
+        st.session_state["relevance_badges"] = relevance_badges
+    _render_preview_grid(preview_urls, page_indices, relevance_badges)
 
     col_d1, col_d2 = st.columns([1, 1])
     with col_d1:
@@ -224,7 +380,10 @@ if preview_urls:
         do_download_sel = st.button("選択をダウンロード")
 
     if do_download_all or do_download_sel:
-        target_urls = [str(u) for u in preview_urls] if do_download_all else list(selected)
+        if do_download_all:
+            target_urls = list(preview_urls)
+        else:
+            target_urls = [u for u, flag in zip(preview_urls, selected_mask, strict=True) if flag]
         if not target_urls:
             st.info("選択された画像がありません。")
         else:
@@ -232,16 +391,18 @@ if preview_urls:
                 try:
                     progress = st.progress(0)
 
+                    last_pct = [-1]
+
                     def cb(done, total):
-                        progress.progress(int(done / total * 100))
+                        # Send to the frontend only when the integer percentage changes
+                        pct = done * 100 // total
+                        if pct != last_pct[0]:
+                            last_pct[0] = pct
+                            progress.progress(pct)
 
                     # Build filter
-                    allow_list = (
-                        [d.strip() for d in allow_domains.split(",") if d.strip()] if allow_domains.strip() else None
-                    )
-                    deny_list = (
-                        [d.strip() for d in deny_domains.split(",") if d.strip()] if deny_domains.strip() else None
-                    )
+                    allow_list = _parse_domain_list(allow_domains) or None
+                    deny_list = _parse_domain_list(deny_domains) or None
                     download_filter = DownloadFilter(
                         min_width=min_width if min_width > 0 else None,
                         min_height=min_height if min_height > 0 else None,
@@ -252,7 +413,7 @@ if preview_urls:
                     # US2: If we have provenance entries (topic mode), use download_selected
                     if provenance_entries:
                         # Filter entries to only selected URLs
-                        selected_entries = [e for e in provenance_entries if str(e.image_url) in target_urls]
+                        selected_entries = [url_to_entry[u] for u in target_urls if u in url_to_entry]
 
                         paths, index_path = download_selected(
                             entries=selected_entries,
@@ -264,28 +425,8 @@ if preview_urls:
 
                         st.success(f"保存: {len(paths)} 枚 | Provenance Index: {index_path}")
                     else:
-                        # URL mode: apply domain filter manually then download
-                        filtered_target = target_urls
-                        if download_filter.allow_domains or download_filter.deny_domains:
-                            from urllib.parse import urlparse
-
-                            def _domain_check(u: str) -> bool:
-                                domain = urlparse(u).netloc.lower()
-                                if download_filter.allow_domains:
-                                    if not any(
-                                        domain == d.lower() or domain.endswith("." + d.lower())
-                                        for d in download_filter.allow_domains
-                                    ):
-                                        return False
-                                if download_filter.deny_domains:
-                                    if any(
-                                        domain == d.lower() or domain.endswith("." + d.lower())
-                                        for d in download_filter.deny_domains
-                                    ):
-                                        return False
-                                return True
-
-                            filtered_target = [u for u in target_urls if _domain_check(u)]
+                        # URL mode: apply the same domain filter as topic mode, then download
+                        filtered_target = filter_urls(target_urls, download_filter)
 
                         paths = scraper.download_images_parallel(
                             filtered_target, output_dir.strip(), respect_robots=respect_robots, progress_cb=cb
@@ -298,39 +439,42 @@ if preview_urls:
                             with grid[i % 5]:
                                 st.image(p, caption="✅ " + Path(p).name, width="stretch")
 
-                        # Offer ZIP download to user
-                        import io
-                        import zipfile
-
-                        mem = io.BytesIO()
-                        with zipfile.ZipFile(mem, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-                            for p in paths:
-                                with open(p, "rb") as f:
-                                    zf.writestr(Path(p).name, f.read())
-                        mem.seek(0)
-                        dl_filename = "images_download.zip"
-                        st.download_button(
-                            label="ZIPをダウンロード",
-                            data=mem.getvalue(),
-                            file_name=dl_filename,
-                            mime="application/zip",
-                        )
-
-                        # Store download info for Google Drive upload
+                        # Store download info for ZIP download and Google Drive upload
                         st.session_state["last_download_dir"] = output_dir.strip()
                         st.session_state["last_download_count"] = len(paths)
+                        st.session_state["last_download_paths"] = paths
+                        st.session_state.pop("zip_requested", None)
 
                 except Exception as e:
                     st.error(f"ダウンロードに失敗しました: {e}")
 
+# --- ZIP ダウンロード（ZIPはユーザーが要求したときだけ作成する） ---
+last_download_paths: list[str] = st.session_state.get("last_download_paths") or []
+if last_download_paths:
+    if st.button("ZIPを作成"):
+        st.session_state["zip_requested"] = True
+    if st.session_state.get("zip_requested"):
+        try:
+            zip_path = _session_zip_path(_zip_cache_key(last_download_paths))
+            with open(zip_path, "rb") as zip_file:
+                st.download_button(
+                    label="ZIPをダウンロード",
+                    data=zip_file,
+                    file_name="images_download.zip",
+                    mime="application/zip",
+                )
+        except OSError as e:
+            st.error(f"ZIPの作成に失敗しました: {e}")
+            st.session_state.pop("zip_requested", None)
+
 # --- Google Drive アップロードセクション ---
 if st.session_state.get("last_download_dir") and st.session_state.get("last_download_count", 0) > 0:
     st.divider()
     st.subheader("Google Drive にアップロード")
 
     # Check rclone availability
-    uploader = RcloneUploader("gdrive")
-    if not uploader.is_available():
+    uploader, rclone_available = _get_gdrive_uploader()
+    if not rclone_available:
         st.warning(
             "rclone が設定されていません。ターミナルで `rclone config` を実行して gdrive リモートを設定してください。"
         )
@@ -385,6 +529,10 @@ if st.session_state.get("last_download_dir") and st.session_state.get("last_down
                             # Clear session state
                             st.session_state.pop("last_download_dir", None)
                             st.session_state.pop("last_download_count", None)
+                            st.session_state.pop("last_download_paths", None)
+                            st.session_state.pop("zip_requested", None)
+                            # The uploaded images are gone, so their ZIP is stale too
+                            _discard_session_zip()
                         else:
                             st.warning(f"{len(failed_files)}枚がアップロード失敗: {', '.join(failed_files[:5])}")
                     except Exception as e:
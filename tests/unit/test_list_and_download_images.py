@@ -41,6 +41,21 @@ class TestListAndDownloadImages(unittest.TestCase):
         self.assertIn("https://example.com/b.svg", urls)
         mock_request.assert_called_once_with("https://example.com/page")
 
+    @mock.patch.object(mod, "BeautifulSoup")
+    @mock.patch.object(mod, "_request_with_retry")
+    def test_imgタグのないページはHTMLを解析しない(self, mock_request: mock.Mock, mock_soup: mock.Mock):
+        # Arrange
+        mock_request.return_value = DummyResp("<html><body><p>no images</p><IMAGE-LIST></body></html>")
+
+        # Act
+        urls = mod.list_images("https://example.com/page", respect_robots=False)
+        metas = mod.list_images_with_metadata("https://example.com/page", respect_robots=False)
+
+        # Assert
+        self.assertEqual(urls, [])
+        self.assertEqual(metas, [])
+        mock_soup.assert_not_called()
+
     @mock.patch.object(mod, "_robots_allowed")
     @mock.patch.object(mod, "_download_image")
     def test_download_images_robots_txtで禁止されたURLをスキップする(
@@ -76,6 +91,79 @@ class TestListAndDownloadImages(unittest.TestCase):
         self.assertEqual(mock_robots.call_count, 3)  # 全URLに対してチェック
         self.assertTrue(all(s.endswith((".jpg", ".png", ".svg", ".bin")) for s in saved_paths))
 
+    @mock.patch.object(mod.robotparser, "RobotFileParser")
+    def test_robots_txtは同一ホストで一度だけ取得される(self, mock_parser_cls: mock.Mock):
+        # Arrange
+        mock_parser_cls.return_value.can_fetch.return_value = True
+        mod._robots_cache.clear()
+        self.addCleanup(mod._robots_cache.clear)
+
+        # Act
+        results = [
+            mod.robots_allowed("https://example.com/a.jpg"),
+            mod.robots_allowed("https://example.com/b.jpg"),
+            mod.robots_allowed("https://other.example.org/c.jpg"),
+        ]
+
+        # Assert
+        self.assertEqual(results, [True, True, True])
+        self.assertEqual(mock_parser_cls.return_value.read.call_count, 2)  # ホストごとに1回
+        mock_parser_cls.assert_any_call("https://example.com/robots.txt")
+
+    @mock.patch.object(mod.robotparser, "RobotFileParser")
+    def test_robots_txtキャッシュは上限を超えると最も古いホストから破棄される(self, mock_parser_cls: mock.Mock):
+        # Arrange
+        mock_parser_cls.return_value.can_fetch.return_value = True
+        mod._robots_cache.clear()
+        self.addCleanup(mod._robots_cache.clear)
+
+        # Act
+        with mock.patch.object(mod, "ROBOTS_CACHE_MAXSIZE", 2):
+            for host in ("a", "b", "a", "c"):
+                mod.robots_allowed(f"https://{host}.example.com/x.jpg")
+
+        # Assert
+        self.assertEqual(list(mod._robots_cache), ["https://a.example.com", "https://c.example.com"])
+        self.assertEqual(mock_parser_cls.return_value.read.call_count, 3)
+
+    def test_Disallowのないrobots_txtはURLごとの判定を省略する(self):
+        # Arrange
+        mod._robots_cache.clear()
+        self.addCleanup(mod._robots_cache.clear)
+
+        def fake_read(rp):
+            rp.parse(["User-agent: *", "Allow: /"])
+
+        # Act
+        with (
+            mock.patch.object(mod.robotparser.RobotFileParser, "read", fake_read),
+            mock.patch.object(mod.robotparser.RobotFileParser, "can_fetch") as mock_can_fetch,
+        ):
+            allowed = mod.robots_allowed("https://open.example.com/a.jpg")
+
+        # Assert
+        self.assertTrue(allowed)
+        mock_can_fetch.assert_not_called()
+        self.assertIsNone(mod._robots_cache["https://open.example.com"][0])
+
+    def test_Disallowのあるrobots_txtはパスごとに判定する(self):
+        # Arrange
+        mod._robots_cache.clear()
+        self.addCleanup(mod._robots_cache.clear)
+
+        def fake_read(rp):
+            rp.parse(["User-agent: *", "Disallow: /private/"])
+
+        # Act
+        with mock.patch.object(mod.robotparser.RobotFileParser, "read", fake_read):
+            results = [
+                mod.robots_allowed("https://closed.example.com/public/a.jpg"),
+                mod.robots_allowed("https://closed.example.com/private/b.jpg"),
+            ]
+
+        # Assert
+        self.assertEqual(results, [True, False])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -15,7 +15,7 @@ class TestParallelDownload(unittest.TestCase):
         urls = [f"https://example.com/{i}.jpg" for i in range(6)]
         calls = []
 
-        def fake_download(u: str, dest: str):
+        def fake_download(u: str, dest: str, session=None):
             time.sleep(0.01)
             calls.append(u)
             return f"{dest}/x{len(calls)}.jpg"
@@ -39,6 +39,23 @@ class TestParallelDownload(unittest.TestCase):
         self.assertEqual(progresses[-1][0], len(urls), "最終進捗の完了数が総数と一致すること")
         self.assertEqual(progresses[-1][1], len(urls), "最終進捗の総数が期待値と一致すること")
 
+    @mock.patch.object(mod, "_robots_allowed", return_value=True)
+    def test_指定したセッションでダウンロードする(self, _mock_robots_allowed):
+        # Arrange: 画像レスポンスを返すセッションを用意
+        session = mock.Mock()
+        session.get.return_value.headers = {"Content-Type": "image/png"}
+        session.get.return_value.content = b"png"
+        urls = [f"https://example.com/s{i}.png" for i in range(2)]
+
+        # Act
+        with mock.patch.object(mod, "_SESSION") as shared_session:
+            result = mod.download_images_parallel(urls, "./.tmp_test_out", max_workers=2, session=session)
+
+        # Assert: 共有セッションではなく指定セッションが使われる
+        self.assertEqual(len(result), 2)
+        self.assertEqual(session.get.call_count, 2)
+        shared_session.get.assert_not_called()
+
 
 if __name__ == "__main__":
     unittest.main()
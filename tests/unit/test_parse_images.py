@@ -1,36 +1,46 @@
+import functools
+import types
 import unittest
-from unittest import mock
 
 from src.lib import image_scraper as mod
 
+_FIXTURE_HTML = """
+<html><head><title>t</title></head>
+<body>
+  <img src="/images/a.jpg">
+  <img data-src="//cdn.example.com/x.png?v=1">
+  <img src="not-an-image.txt">
+  <img src="/icons/icon.svg">
+</body></html>
+"""
+_FIXTURE_BYTES = _FIXTURE_HTML.encode("utf-8")
+
 
 class DummyResp:
-    def __init__(self, text: str, status_code: int = 200):
+    def __init__(self, text: str, status_code: int = 200, content: bytes | None = None):
         self.text = text
         self.status_code = status_code
-        self.headers = {"Content-Type": "text/html"}
-        self.content = text.encode("utf-8")
+        self.headers = types.MappingProxyType({"Content-Type": "text/html"})
+        self.content = content if content is not None else text.encode("utf-8")
 
     def raise_for_status(self):
         if not (200 <= self.status_code < 300):
             raise RuntimeError("HTTP error")
 
 
+@functools.cache
+def _default_resp() -> DummyResp:
+    """全テストで共有するフィクスチャHTMLのレスポンス（ヘッダーは読み取り専用）"""
+    return DummyResp(_FIXTURE_HTML, content=_FIXTURE_BYTES)
+
+
 class TestParseImages(unittest.TestCase):
-    @mock.patch.object(mod, "_request_with_retry")
-    def test_画像URLを抽出し正規化する(self, mock_request):
-        # Arrange
-        html = """
-        <html><head><title>t</title></head>
-        <body>
-          <img src="/images/a.jpg">
-          <img data-src="//cdn.example.com/x.png?v=1">
-          <img src="not-an-image.txt">
-          <img src="/icons/icon.svg">
-        </body></html>
-        """
-        mock_request.return_value = DummyResp(html)
+    def setUp(self):
+        # 単一属性の差し替えなのでMagicMockを使わず直接置き換え、終了時に元へ戻す
+        self.addCleanup(setattr, mod, "_request_with_retry", mod._request_with_retry)
+        mod._request_with_retry = lambda *args, **kwargs: _default_resp()
 
+    def test_画像URLを抽出し正規化する(self):
         # Act
         res = mod.scrape_images("https://example.com/page", "./.tmp_test_out", limit=None, respect_robots=False)
 
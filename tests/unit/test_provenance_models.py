@@ -5,36 +5,33 @@ from src.lib.models_discovery import PreviewResult, ProvenanceEntry, QueryLogEnt
 
 
 class TestProvenanceModels(unittest.TestCase):
-    def test_provenance_entry_fields(self):
-        entry = ProvenanceEntry(
+    @classmethod
+    def setUpClass(cls):
+        # テストはモデルを変更しないため、検証済みインスタンスをクラスで共有する
+        cls._entry = ProvenanceEntry(
             topic="富士山",
             source_page_url="https://example.com/page",  # type: ignore[arg-type]
             image_url="https://example.com/img.jpg",  # type: ignore[arg-type]
             discovery_method="SERP",
         )
-        self.assertIsInstance(entry.timestamp, datetime)
-        self.assertEqual(entry.topic, "富士山")
+        cls._log = QueryLogEntry(topic="富士山", provider="duckduckgo", query="富士山")
+
+    def test_provenance_entry_fields(self):
+        self.assertIsInstance(self._entry.timestamp, datetime)
+        self.assertEqual(self._entry.topic, "富士山")
 
     def test_query_log_entry_defaults(self):
-        log = QueryLogEntry(topic="富士山", provider="duckduckgo", query="富士山")
-        self.assertEqual(log.page_count, 0)
-        self.assertEqual(log.image_count, 0)
-        self.assertIsInstance(log.timestamp, datetime)
+        self.assertEqual(self._log.page_count, 0)
+        self.assertEqual(self._log.image_count, 0)
+        self.assertIsInstance(self._log.timestamp, datetime)
 
     def test_preview_result_to_dict(self):
-        entry = ProvenanceEntry(
-            topic="富士山",
-            source_page_url="https://example.com/page",  # type: ignore[arg-type]
-            image_url="https://example.com/img.jpg",  # type: ignore[arg-type]
-            discovery_method="SERP",
-        )
-        log = QueryLogEntry(topic="富士山", provider="duckduckgo", query="富士山")
         preview = PreviewResult(
             topic="富士山",
-            entries=[entry],
+            entries=[self._entry],
             total_images=1,
             provider="duckduckgo",
-            query_log=log,
+            query_log=self._log,
         )
         d = preview.to_dict()
         self.assertEqual(d["total_images"], 1)
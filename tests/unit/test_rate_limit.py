@@ -10,6 +10,14 @@ class TestTokenBucket(unittest.TestCase):
     t.wada流テスト哲学に従い、時間依存を排除した確定的テストを実装。
     """
 
+    def _drained_bucket(self, capacity: int = 2, fill_rate: float = 10) -> TokenBucket:
+        """トークンを使い切った TokenBucket を返す（時刻をモックする場合は呼び出し前に設定する）"""
+        tb = TokenBucket(capacity=capacity, fill_rate=fill_rate)
+        for _ in range(capacity):
+            tb.non_blocking_try_acquire()
+        self.assertFalse(tb.non_blocking_try_acquire())  # 空を確認
+        return tb
+
     def test_初期状態で容量分のトークンを取得できる(self):
         """
         Given: capacity=2 のTokenBucketを作成
@@ -30,9 +38,7 @@ class TestTokenBucket(unittest.TestCase):
         Then: 失敗する（False）
         """
         # Arrange
-        tb = TokenBucket(capacity=2, fill_rate=10)
-        tb.non_blocking_try_acquire()
-        tb.non_blocking_try_acquire()
+        tb = self._drained_bucket()
 
         # Act
         result = tb.non_blocking_try_acquire()
@@ -49,10 +55,7 @@ class TestTokenBucket(unittest.TestCase):
         """
         # Arrange: 時刻を固定し、初期状態でトークンを使い切る
         mock_time.monotonic.return_value = 0.0
-        tb = TokenBucket(capacity=2, fill_rate=10)
-        tb.non_blocking_try_acquire()
-        tb.non_blocking_try_acquire()
-        self.assertFalse(tb.non_blocking_try_acquire())  # 空を確認
+        tb = self._drained_bucket()
 
         # Act: 0.1秒経過させてトークン取得を試みる
         mock_time.monotonic.return_value = 0.1  # +0.1秒 → 1トークン補充
@@ -70,9 +73,7 @@ class TestTokenBucket(unittest.TestCase):
         """
         # Arrange
         mock_time.monotonic.return_value = 0.0
-        tb = TokenBucket(capacity=2, fill_rate=10)
-        tb.non_blocking_try_acquire()
-        tb.non_blocking_try_acquire()
+        tb = self._drained_bucket()
 
         # Act: 1秒経過させる
         mock_time.monotonic.return_value = 1.0
@@ -83,11 +84,11 @@ class TestTokenBucket(unittest.TestCase):
         self.assertFalse(tb.non_blocking_try_acquire())
 
     @mock.patch("src.lib.application.services.rate_limiter.time")
-    def test_acquire_はトークンが利用可能になるまでポーリングする(self, mock_time):
+    def test_acquire_は不足分が補充されるまで一度だけ待機する(self, mock_time):
         """
         Given: capacity=1, fill_rate=2 のTokenBucketからトークンを取得済み
         When: acquire()を呼び、time.sleep()が呼ばれるたびに時刻を進める
-        Then: トークンが補充されたタイミングで正常に取得できる
+        Then: 補充に必要な0.5秒だけ一度sleepし、正常に取得できる
         """
         # Arrange
         current_time = 0.0
@@ -103,14 +104,13 @@ class TestTokenBucket(unittest.TestCase):
 
         mock_time.sleep = mock_sleep
 
-        tb = TokenBucket(capacity=1, fill_rate=2)
-        tb.non_blocking_try_acquire()  # 初期トークンを消費
+        tb = self._drained_bucket(capacity=1, fill_rate=2)  # 初期トークンを消費
 
-        # Act: acquire()を呼ぶとポーリング＋sleepが発生する
+        # Act: acquire()を呼ぶと不足分の補充時間だけsleepが発生する
         tb.acquire()
 
-        # Assert: sleep()が少なくとも1回呼ばれ、取得に成功したこと
-        self.assertGreater(len(sleep_calls), 0, "sleep()が呼ばれるべき")
+        # Assert: ポーリングせず、補充時間ちょうどのsleep()1回で取得に成功したこと
+        self.assertEqual(sleep_calls, [0.5])
 
     @mock.patch("src.lib.application.services.rate_limiter.time")
     def test_acquire_はタイムアウト時にTimeoutErrorを発生させる(self, mock_time):
@@ -130,8 +130,7 @@ class TestTokenBucket(unittest.TestCase):
 
         mock_time.sleep = mock_sleep
 
-        tb = TokenBucket(capacity=1, fill_rate=2)
-        tb.non_blocking_try_acquire()  # 初期トークンを消費
+        tb = self._drained_bucket(capacity=1, fill_rate=2)  # 初期トークンを消費
 
         # Act & Assert
         with self.assertRaises(TimeoutError):
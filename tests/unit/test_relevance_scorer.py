@@ -11,6 +11,7 @@ import unittest
 
 from src.lib.domain.services import (
     calculate_relevance_score,
+    calculate_relevance_scores_batch,
     extract_domain_from_url,
     extract_filename_from_url,
 )
@@ -75,6 +76,11 @@ class TestCalculateRelevanceScore(unittest.TestCase):
         )
         self.assertEqual(score, 0.1)
 
+    def test_信頼ドメインに似た別ドメインは信頼しない(self):
+        """末尾が一致するだけのnotwikimedia.orgや大文字表記の扱いを確認."""
+        self.assertEqual(calculate_relevance_score(topic="test", domain="notwikimedia.org"), 0.0)
+        self.assertEqual(calculate_relevance_score(topic="test", domain="Upload.WikiMedia.org"), 0.1)
+
     def test_複数フィールド一致時のスコア合成(self):
         """すべてのフィールドが一致する場合、高スコアを返す."""
         score = calculate_relevance_score(
@@ -116,6 +122,14 @@ class TestCalculateRelevanceScore(unittest.TestCase):
         )
         self.assertEqual(score_lower, score_upper)
 
+    def test_ケースフォールディングで大文字小文字を比較する(self):
+        """ドイツ語のßのようにlower()では揃わない表記もcasefoldで一致する."""
+        score = calculate_relevance_score(
+            topic="Straße",
+            alt_text="STRASSE at night",
+        )
+        self.assertAlmostEqual(score, 0.4)
+
     def test_単一文字トークンは無視される(self):
         """'a'や'I'などの単一文字はトークン化時にフィルタリング."""
         score = calculate_relevance_score(
@@ -142,6 +156,45 @@ class TestCalculateRelevanceScore(unittest.TestCase):
         self.assertEqual(score, 0.0)
 
 
+class TestCalculateRelevanceScoresBatch(unittest.TestCase):
+    """一括スコア計算の振る舞いテスト."""
+
+    def test_個別計算と同じスコアを入力順に返す(self):
+        """バッチ結果は画像ごとのcalculate_relevance_scoreと一致する."""
+        alts = ["富士山の写真", None, "sunset"]
+        filenames = ["fuji.jpg", "富士山.png", None]
+        contexts = [None, "富士山 山頂", "beach"]
+        domains = ["pixabay.com", "example.com", None]
+
+        scores = calculate_relevance_scores_batch("富士山", alts, filenames, contexts, domains)
+
+        expected = [
+            calculate_relevance_score("富士山", alt_text=a, filename=f, context_text=c, domain=d)
+            for a, f, c, d in zip(alts, filenames, contexts, domains, strict=True)
+        ]
+        self.assertEqual(scores, expected)
+
+    def test_同じ文脈とドメインを共有する画像も個別計算と一致する(self):
+        """同一ページ由来で文脈・ドメインが重複していても結果は変わらない."""
+        alts = ["富士山", "海", None, "富士山 夕焼け"]
+        filenames = ["a.jpg", "富士山.jpg", "c.jpg", None]
+        contexts = ["富士山の案内", "富士山の案内", None, "富士山の案内"]
+        domains = ["upload.wikimedia.org"] * 3 + [None]
+
+        scores = calculate_relevance_scores_batch("富士山 夕焼け", alts, filenames, contexts, domains)
+
+        expected = [
+            calculate_relevance_score("富士山 夕焼け", alt_text=a, filename=f, context_text=c, domain=d)
+            for a, f, c, d in zip(alts, filenames, contexts, domains, strict=True)
+        ]
+        self.assertEqual(scores, expected)
+
+    def test_空トピックの場合すべて0(self):
+        """空トピックでは入力件数分の0を返す."""
+        scores = calculate_relevance_scores_batch("  ", ["test", "test"], [None, None], [None, None], [None, None])
+        self.assertEqual(scores, [0.0, 0.0])
+
+
 class TestExtractFilenameFromUrl(unittest.TestCase):
     """URLからファイル名を抽出する振る舞いテスト."""
 
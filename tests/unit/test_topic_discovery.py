@@ -1,37 +1,143 @@
+import hashlib
 import json
 import os
+import shutil
 import tempfile
+import threading
+import time
 import unittest
-from unittest.mock import patch
+from contextlib import ExitStack
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Final
+from unittest.mock import MagicMock, patch
 
+from src.lib import topic_discovery as td
 from src.lib.image_scraper import ImageMetadata
 from src.lib.models_discovery import DownloadFilter, PreviewResult, ProvenanceEntry
 from src.lib.topic_discovery import (
     discover_topic,
     download_selected,
     filter_entries,
+    filter_urls,
 )
 
+URL1 = "https://example.com/img1.jpg"
+URL2 = "https://example.com/img2.jpg"
+URL_LARGE = "https://example.com/large.jpg"
+URL_SMALL = "https://example.com/small.jpg"
+
+
+def _hash16(url: str, _sha256=hashlib.sha256) -> str:
+    """Saved-file stem for url: first 16 hex chars of its SHA-256 (constructor bound at definition)."""
+    return _sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+# Hashed once at import
+HASH1, HASH2, HASH_LARGE, HASH_SMALL = map(_hash16, (URL1, URL2, URL_LARGE, URL_SMALL))
+
+
+def _make_entry(image_url: str, source_page_url: str = "https://example.com/") -> ProvenanceEntry:
+    return ProvenanceEntry(
+        topic="test",
+        source_page_url=source_page_url,  # type: ignore[arg-type]
+        image_url=image_url,  # type: ignore[arg-type]
+        discovery_method="SERP",
+    )
+
+
+# Filters are never mutated by the code under test; validate them once at import
+_ALLOW_ALLOWED: Final = DownloadFilter(allow_domains=["allowed.com"])
+_DENY_SPAM: Final = DownloadFilter(deny_domains=["spam.com"])
+_ALLOW_GOOD_DENY_ADS: Final = DownloadFilter(allow_domains=["good.com"], deny_domains=["ads.good.com"])
+_MIN_800X600: Final = DownloadFilter(min_width=800, min_height=600)
+
+
+def _entries(*image_urls: str) -> tuple[ProvenanceEntry, ...]:
+    return tuple(map(_make_entry, image_urls))
+
+
+# Entry fixtures built once at import; tests hand list() copies to the code under test
+_ENTRIES_IMG12 = _entries(URL1, URL2)
+_ENTRIES_GOOD_SPAM = _entries("https://good.com/img1.jpg", "https://spam.com/img2.jpg")
+_ENTRIES_LARGE_SMALL = _entries(URL_LARGE, URL_SMALL)
+_ENTRIES_TRACKERS = _entries(
+    "https://good.com/img1.jpg",
+    "https://cdn.tracker4321.net/img2.jpg",
+    "https://tracker4321.net.good.com/img3.jpg",
+)
+
+
+def _touch(path: str, data: bytes = b"fake") -> None:
+    """Create a stub downloaded file with raw os calls (no buffered file object)."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+def _returns(value):
+    """Plain stub that accepts any call and returns value (no MagicMock call tracking)."""
+    return lambda *args, **kwargs: value
+
+
+def _images_by_page(images: dict[str, list[ImageMetadata]]):
+    """list_images_with_metadata stub keyed by page URL, independent of concurrent fetch order."""
+    return lambda page, **kwargs: images[page]
+
 
 class TestTopicDiscovery(unittest.TestCase):
     """Test topic discovery orchestrator with mocked search provider."""
 
-    @patch("src.lib.topic_discovery.search_provider.search_pages")
-    @patch("src.lib.topic_discovery.list_images_with_metadata")
-    @patch("src.lib.topic_discovery.robots_allowed")
-    def test_discover_topic_with_mocked_provider(self, mock_robots, mock_list, mock_search):
+    @classmethod
+    def setUpClass(cls):
+        # The no-results preview is deterministic, so build it once for the tests that only inspect it
+        saved = td.search_provider.search_pages
+        td.search_provider.search_pages = _returns([])
+        try:
+            cls._empty_preview = discover_topic("no results topic", limit=10)
+        finally:
+            td.search_provider.search_pages = saved
+
+    def setUp(self):
+        # Swap module attributes directly instead of stacking patch() decorators;
+        # the originals are put back by the cleanup below.
+        saved = (td.search_provider.search_pages, td.list_images_with_metadata, td.robots_allowed, td.logger)
+        self.addCleanup(self._restore, saved)
+
+    @staticmethod
+    def _restore(saved) -> None:
+        td.search_provider.search_pages, td.list_images_with_metadata, td.robots_allowed, td.logger = saved
+
+    def _install(self, *, search=None, list_images=None, robots=None, logger=None) -> None:
+        """Replace the given collaborators of discover_topic with stubs for this test."""
+        if search is not None:
+            td.search_provider.search_pages = search
+        if list_images is not None:
+            td.list_images_with_metadata = list_images
+        if robots is not None:
+            td.robots_allowed = robots
+        if logger is not None:
+            td.logger = logger
+
+    def test_discover_topic_with_mocked_provider(self):
         """Test that discover_topic collects images from search results."""
-        mock_search.return_value = ["https://example.com/page1", "https://example.com/page2"]
-        mock_robots.return_value = True
-        mock_list.side_effect = [
-            [
-                ImageMetadata(url="https://example.com/img1.jpg", alt="test topic image", context=None),
-                ImageMetadata(url="https://example.com/img2.jpg", alt=None, context=None),
-            ],
-            [
-                ImageMetadata(url="https://example.com/img3.jpg", alt=None, context=None),
-            ],
-        ]
+        self._install(
+            search=_returns(["https://example.com/page1", "https://example.com/page2"]),
+            robots=_returns(True),
+            list_images=_images_by_page(
+                {
+                    "https://example.com/page1": [
+                        ImageMetadata(url="https://example.com/img1.jpg", alt="test topic image", context=None),
+                        ImageMetadata(url="https://example.com/img2.jpg", alt=None, context=None),
+                    ],
+                    "https://example.com/page2": [
+                        ImageMetadata(url="https://example.com/img3.jpg", alt=None, context=None),
+                    ],
+                }
+            ),
+        )
 
         result = discover_topic("test topic", limit=10)
 
@@ -44,17 +150,20 @@ class TestTopicDiscovery(unittest.TestCase):
             self.assertEqual(entry.topic, "test topic")
             self.assertIn("example.com", str(entry.source_page_url))
 
-    @patch("src.lib.topic_discovery.search_provider.search_pages")
-    @patch("src.lib.topic_discovery.list_images_with_metadata")
-    @patch("src.lib.topic_discovery.robots_allowed")
-    def test_robots_disallowed_pages_skipped(self, mock_robots, mock_list, mock_search):
+    def test_robots_disallowed_pages_skipped(self):
         """Test that pages disallowed by robots.txt are skipped."""
-        mock_search.return_value = ["https://blocked.com/", "https://allowed.com/"]
-        # First page blocked, second allowed
-        mock_robots.side_effect = [False, True]
-        mock_list.return_value = [
-            ImageMetadata(url="https://allowed.com/img.jpg", alt=None, context=None),
-        ]
+        self._install(
+            search=_returns(["https://blocked.com/", "https://allowed.com/"]),
+            # First page blocked, second allowed
+            robots=lambda page: page != "https://blocked.com/",
+            list_images=_images_by_page(
+                {
+                    "https://allowed.com/": [
+                        ImageMetadata(url="https://allowed.com/img.jpg", alt=None, context=None),
+                    ],
+                }
+            ),
+        )
 
         result = discover_topic("test", limit=10)
 
@@ -62,67 +171,130 @@ class TestTopicDiscovery(unittest.TestCase):
         self.assertEqual(result.total_images, 1)
         self.assertEqual(str(result.entries[0].source_page_url), "https://allowed.com/")
 
-    @patch("src.lib.topic_discovery.search_provider.search_pages")
-    def test_discover_topic_empty_when_no_results(self, mock_search):
+    def test_discover_topic_empty_when_no_results(self):
         """Test that empty result is returned when search returns nothing."""
-        mock_search.return_value = []
-
-        result = discover_topic("no results topic", limit=10)
+        result = self._empty_preview
 
         self.assertIsInstance(result, PreviewResult)
         self.assertEqual(result.total_images, 0)
         self.assertEqual(result.query_log.topic, "no results topic")
 
-    @patch("src.lib.topic_discovery.search_provider.search_pages")
-    @patch("src.lib.topic_discovery.list_images_with_metadata")
-    @patch("src.lib.topic_discovery.robots_allowed")
-    def test_limit_respected(self, mock_robots, mock_list, mock_search):
+    def test_limit_respected(self):
         """Test that image limit is respected."""
-        mock_search.return_value = ["https://example.com/page1", "https://example.com/page2"]
-        mock_robots.return_value = True
-        # Each page returns 5 images
-        mock_list.return_value = [
-            ImageMetadata(url=f"https://example.com/img{i}.jpg", alt=None, context=None) for i in range(5)
-        ]
+        self._install(
+            search=_returns(["https://example.com/page1", "https://example.com/page2"]),
+            robots=_returns(True),
+            # Each page returns 5 images
+            list_images=_returns(
+                [ImageMetadata(url=f"https://example.com/img{i}.jpg", alt=None, context=None) for i in range(5)]
+            ),
+        )
 
         result = discover_topic("test", limit=3)
 
         # Should stop at limit
         self.assertEqual(result.total_images, 3)
 
-    @patch("src.lib.topic_discovery.search_provider.search_pages")
-    @patch("src.lib.topic_discovery.list_images_with_metadata")
-    @patch("src.lib.topic_discovery.robots_allowed")
-    @patch("src.lib.topic_discovery.logger")
-    def test_logging_called(self, mock_logger, mock_robots, mock_list, mock_search):
+    def test_closing_page_iterator_does_not_wait_for_slow_fetches(self):
+        """Test that stopping early returns without joining page fetches still in flight."""
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def list_images(page, **kwargs):
+            if page != "https://example.com/page0":
+                release.wait(5)
+            return []
+
+        self._install(robots=_returns(True), list_images=list_images)
+        pages = td._iter_page_images([f"https://example.com/page{i}" for i in range(10)])
+
+        self.assertEqual(next(pages), ("https://example.com/page0", []))
+        start = time.monotonic()
+        pages.close()
+
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertFalse(release.is_set())
+
+    def test_duplicate_images_across_pages_collected_once(self):
+        """Test that an image found on several pages yields a single entry."""
+        self._install(
+            search=_returns(["https://example.com/page1", "https://example.com/page2"]),
+            robots=_returns(True),
+            list_images=_images_by_page(
+                {
+                    "https://example.com/page1": [
+                        ImageMetadata(url="https://cdn.example.com/shared.jpg", alt=None, context=None),
+                    ],
+                    "https://example.com/page2": [
+                        ImageMetadata(url="https://cdn.example.com/shared.jpg", alt=None, context=None),
+                        ImageMetadata(url="https://cdn.example.com/other.jpg", alt=None, context=None),
+                    ],
+                }
+            ),
+        )
+
+        result = discover_topic("test", limit=10)
+
+        self.assertEqual(result.total_images, 2)
+        self.assertEqual(str(result.entries[0].source_page_url), "https://example.com/page1")
+
+    def test_duplicate_images_differing_in_host_case_collected_once(self):
+        """Test that image URLs are deduplicated after URL normalization."""
+        self._install(
+            search=_returns(["https://example.com/page1"]),
+            robots=_returns(True),
+            list_images=_returns(
+                [
+                    ImageMetadata(url="https://CDN.Example.com/shared.jpg", alt=None, context=None),
+                    ImageMetadata(url="https://cdn.example.com/shared.jpg", alt=None, context=None),
+                ]
+            ),
+        )
+
+        result = discover_topic("test", limit=10)
+
+        self.assertEqual(result.total_images, 1)
+        self.assertEqual(str(result.entries[0].image_url), "https://cdn.example.com/shared.jpg")
+
+    def test_logging_called(self):
         """Test that proper logging is performed."""
-        mock_search.return_value = []
+        events: set[str] = set()
+
+        def record(msg: str, *args, **kwargs) -> None:
+            # Messages start with an event name ("discover_topic.start topic=%s ...")
+            events.add(msg.split(" ", 1)[0])
+
+        self._install(search=_returns([]), logger=SimpleNamespace(debug=record, info=record, warning=record))
 
         discover_topic("桜", limit=5)
 
         # Ensure start/end logs invoked
-        calls = [c.args for c in mock_logger.info.call_args_list]
-        start = any("discover_topic.start" in (args[0] if args else "") for args in calls)
-        end = any("discover_topic.end" in (args[0] if args else "") for args in calls)
-        self.assertTrue(start and end)
-
-    @patch("src.lib.topic_discovery.search_provider.search_pages")
-    @patch("src.lib.topic_discovery.list_images_with_metadata")
-    @patch("src.lib.topic_discovery.robots_allowed")
-    def test_query_log_written(self, mock_robots, mock_list, mock_search):
+        self.assertIn("discover_topic.start", events)
+        self.assertIn("discover_topic.end", events)
+
+    def test_query_log_written(self):
         """Test that query log file is created."""
-        mock_search.return_value = ["https://example.com/"]
-        mock_robots.return_value = True
-        mock_list.return_value = [
-            ImageMetadata(url="https://example.com/img.jpg", alt=None, context=None),
-        ]
+        self._install(
+            search=_returns(["https://example.com/"]),
+            robots=_returns(True),
+            list_images=_returns([ImageMetadata(url="https://example.com/img.jpg", alt=None, context=None)]),
+        )
 
-        result = discover_topic("テストトピック", limit=10)
+        with tempfile.TemporaryDirectory() as log_dir, patch.object(td, "_DISCOVERY_LOG_DIR", log_dir):
+            result = discover_topic("テストトピック", limit=10)
+            # The log is written by the background writer; wait for it to drain
+            td._query_log_writer.submit(lambda: None).result()
+            log_files = list(Path(log_dir).glob("*_テストトピック.json"))
+            self.assertEqual(len(log_files), 1)
+            written = json.loads(log_files[0].read_bytes())
 
         # Check that query_log has expected fields
         self.assertEqual(result.query_log.topic, "テストトピック")
         self.assertEqual(result.query_log.provider, "duckduckgo")
         self.assertGreaterEqual(result.query_log.page_count, 0)
+        self.assertEqual(written["topic"], "テストトピック")
+        self.assertEqual(written["page_count"], result.query_log.page_count)
+        self.assertEqual(written["pages"], ["https://example.com/"])
 
 
 class TestSearchProvider(unittest.TestCase):
@@ -140,224 +312,267 @@ class TestSearchProvider(unittest.TestCase):
         result = search_provider.search_pages("test", provider="unknown", max_pages=5)
         self.assertEqual(result, [])
 
+    @patch("src.lib.search_provider._search_duckduckgo")
+    @patch("src.lib.search_provider._search_duckduckgo_images")
+    def test_search_pages_merges_image_and_text_results(self, mock_images, mock_text):
+        from src.lib import search_provider
 
-class TestFilterEntries(unittest.TestCase):
-    """Test US2 filter_entries function."""
+        mock_images.return_value = ["https://a.com/", "https://b.com/"]
+        mock_text.return_value = ["https://b.com/", "https://c.com/", "https://d.com/"]
 
-    def _make_entry(self, image_url: str, source_page_url: str = "https://example.com/") -> ProvenanceEntry:
-        return ProvenanceEntry(
-            topic="test",
-            source_page_url=source_page_url,  # type: ignore[arg-type]
-            image_url=image_url,  # type: ignore[arg-type]
-            discovery_method="SERP",
-        )
+        result = search_provider.search_pages("test", max_pages=3)
+
+        # Image results keep their rank; text results only fill remaining slots
+        self.assertEqual(result, ["https://a.com/", "https://b.com/", "https://c.com/"])
+
+    def test_ddgs_client_reused_across_searches(self):
+        from src.lib import search_provider
+
+        search_threads = []
+
+        def _record(result):
+            def search(*args, **kwargs):
+                search_threads.append(threading.get_ident())
+                return result
+
+            return search
+
+        fake_ddgs = MagicMock()
+        fake_ddgs.return_value.__enter__.return_value = fake_ddgs.return_value
+        fake_ddgs.return_value.images.side_effect = _record([{"source": "https://a.com/"}])
+        fake_ddgs.return_value.text.side_effect = _record([{"href": "https://b.com/"}])
+        exit_stack = ExitStack()
+
+        with (
+            patch.object(search_provider, "DDGS", fake_ddgs),
+            patch.object(search_provider, "_HAS_DDGS", True),
+            patch.object(search_provider, "_ddgs_local", threading.local()),
+            patch.object(search_provider, "_ddgs_exit_stack", exit_stack),
+            patch.object(search_provider, "_rate_limiter", None),
+        ):
+            search_provider.search_pages("first", max_pages=4)
+            search_provider.search_pages("second", max_pages=4)
+
+        # One client per search worker thread, reused by every later search on that thread
+        self.assertEqual(len(search_threads), 4)
+        self.assertEqual(fake_ddgs.call_count, len(set(search_threads)))
+        exit_stack.close()
+        self.assertEqual(fake_ddgs.return_value.__exit__.call_count, fake_ddgs.call_count)
+
+    def test_text_search_retry_does_not_duplicate_urls(self):
+        from src.lib import search_provider
+
+        def _rate_limited_after_first(query, max_results):
+            yield {"href": "https://a.com/"}
+            raise RuntimeError("Ratelimit")
 
-    def test_filter_no_filter_returns_all(self):
-        """Without filter, all entries should be returned."""
-        entries = [
-            self._make_entry("https://a.com/img1.jpg"),
-            self._make_entry("https://b.com/img2.jpg"),
+        fake_ddgs = MagicMock()
+        fake_ddgs.return_value.__enter__.return_value = fake_ddgs.return_value
+        fake_ddgs.return_value.text.side_effect = [
+            _rate_limited_after_first("q", 4),
+            [{"href": "https://a.com/"}, {"href": "https://b.com/"}],
         ]
-        result = filter_entries(entries, None)
-        self.assertEqual(len(result), 2)
-
-    def test_filter_allow_domains(self):
-        """Only entries from allowed domains should pass."""
-        entries = [
-            self._make_entry("https://allowed.com/img1.jpg"),
-            self._make_entry("https://blocked.com/img2.jpg"),
-            self._make_entry("https://sub.allowed.com/img3.jpg"),
+
+        with (
+            patch.object(search_provider, "DDGS", fake_ddgs),
+            patch.object(search_provider, "_HAS_DDGS", True),
+            patch.object(search_provider, "_ddgs_local", threading.local()),
+            patch.object(search_provider, "_ddgs_exit_stack", ExitStack()),
+            patch.object(search_provider, "_rate_limiter", None),
+            patch.object(search_provider, "time"),
+        ):
+            result = search_provider._search_duckduckgo("test", max_pages=2)
+
+        self.assertEqual(result, ["https://a.com/", "https://b.com/"])
+
+
+class TestFilterEntries(unittest.TestCase):
+    """Test US2 filter_entries function."""
+
+    # (case, filter, entries, expected surviving URLs)
+    CASES = [
+        (
+            "no filter returns all",
+            None,
+            _entries("https://a.com/img1.jpg", "https://b.com/img2.jpg"),
+            {"https://a.com/img1.jpg", "https://b.com/img2.jpg"},
+        ),
+        (
+            "allow list keeps allowed domains and their subdomains",
+            _ALLOW_ALLOWED,
+            _entries(
+                "https://allowed.com/img1.jpg",
+                "https://blocked.com/img2.jpg",
+                "https://sub.allowed.com/img3.jpg",
+            ),
+            {"https://allowed.com/img1.jpg", "https://sub.allowed.com/img3.jpg"},
+        ),
+        (
+            "deny list excludes denied domains and their subdomains",
+            _DENY_SPAM,
+            _entries("https://good.com/img1.jpg", "https://spam.com/img2.jpg", "https://ads.spam.com/img3.jpg"),
+            {"https://good.com/img1.jpg"},
+        ),
+        (
+            # ads.good.com is a subdomain of an allowed domain, but also denied
+            "allow and deny are both applied",
+            _ALLOW_GOOD_DENY_ADS,
+            _entries("https://good.com/img1.jpg", "https://ads.good.com/img2.jpg", "https://other.com/img3.jpg"),
+            {"https://good.com/img1.jpg"},
+        ),
+    ]
+
+    def test_filter_matrix(self):
+        """Allow/deny domain semantics of filter_entries, one subTest per case."""
+        for case, flt, entries, expected in self.CASES:
+            with self.subTest(case=case):
+                result = filter_entries(list(entries), flt)
+                self.assertEqual({str(e.image_url) for e in result}, expected)
+                self.assertEqual(len(result), len(expected))
+
+    def test_filter_urls_applies_domain_lists(self):
+        """filter_urls applies the same allow/deny semantics to plain URLs."""
+        urls = [
+            "https://Good.com/img1.jpg",
+            "https://ads.good.com/img2.jpg",
+            "https://other.com/img3.jpg",
         ]
-        flt = DownloadFilter(allow_domains=["allowed.com"])
+        flt = DownloadFilter(allow_domains=["GOOD.com"], deny_domains=["ads.good.com"])
+        self.assertEqual(filter_urls(urls, flt), ["https://Good.com/img1.jpg"])
+        self.assertEqual(filter_urls(urls, None), urls)
+
+    def test_filter_large_deny_list_matches_subdomains(self):
+        """Blocklist-sized deny lists still match exact domains and their subdomains."""
+        entries = list(_ENTRIES_TRACKERS)
+        flt = DownloadFilter(deny_domains=[f"tracker{i}.net" for i in range(10_000)])
         result = filter_entries(entries, flt)
-        self.assertEqual(len(result), 2)
         urls = [str(e.image_url) for e in result]
-        self.assertIn("https://allowed.com/img1.jpg", urls)
-        self.assertIn("https://sub.allowed.com/img3.jpg", urls)
-
-    def test_filter_deny_domains(self):
-        """Entries from denied domains should be excluded."""
-        entries = [
-            self._make_entry("https://good.com/img1.jpg"),
-            self._make_entry("https://spam.com/img2.jpg"),
-            self._make_entry("https://ads.spam.com/img3.jpg"),
-        ]
-        flt = DownloadFilter(deny_domains=["spam.com"])
-        result = filter_entries(entries, flt)
-        self.assertEqual(len(result), 1)
-        self.assertEqual(str(result[0].image_url), "https://good.com/img1.jpg")
-
-    def test_filter_combined_allow_and_deny(self):
-        """When both allow and deny are set, apply both."""
-        entries = [
-            self._make_entry("https://good.com/img1.jpg"),
-            self._make_entry("https://ads.good.com/img2.jpg"),  # subdomain of allowed, but also denied
-            self._make_entry("https://other.com/img3.jpg"),
-        ]
-        flt = DownloadFilter(allow_domains=["good.com"], deny_domains=["ads.good.com"])
-        result = filter_entries(entries, flt)
-        self.assertEqual(len(result), 1)
-        self.assertEqual(str(result[0].image_url), "https://good.com/img1.jpg")
+        self.assertEqual(urls, ["https://good.com/img1.jpg", "https://tracker4321.net.good.com/img3.jpg"])
 
 
-class TestDownloadSelected(unittest.TestCase):
-    """Test US2 download_selected function."""
+class _TmpRootTestCase(unittest.TestCase):
+    """One temporary root per class; each test writes into its own subdirectory of it."""
 
-    def _make_entry(self, image_url: str) -> ProvenanceEntry:
-        return ProvenanceEntry(
-            topic="test",
-            source_page_url="https://example.com/",  # type: ignore[arg-type]
-            image_url=image_url,  # type: ignore[arg-type]
-            discovery_method="SERP",
-        )
+    @classmethod
+    def setUpClass(cls):
+        cls._root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls._root, ignore_errors=True)
+
+    def _tmpdir(self) -> str:
+        path = os.path.join(self._root, self._testMethodName)
+        os.mkdir(path)
+        return path
+
+
+class TestDownloadSelected(_TmpRootTestCase):
+    """Test US2 download_selected function."""
 
     @patch("src.lib.topic_discovery.download_images_parallel")
     def test_download_selected_creates_provenance_index(self, mock_download):
         """Test that provenance_index.json is created."""
-        import hashlib
-
-        url1 = "https://example.com/img1.jpg"
-        url2 = "https://example.com/img2.jpg"
-        entries = [
-            self._make_entry(url1),
-            self._make_entry(url2),
-        ]
+        entries = list(_ENTRIES_IMG12)
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Generate correct hash-based filenames
-            hash1 = hashlib.sha256(url1.encode("utf-8")).hexdigest()[:16]
-            hash2 = hashlib.sha256(url2.encode("utf-8")).hexdigest()[:16]
+        tmpdir = self._tmpdir()
 
-            # Mock download to return fake file paths with correct hash names
-            mock_download.return_value = [
-                os.path.join(tmpdir, f"{hash1}.jpg"),
-                os.path.join(tmpdir, f"{hash2}.jpg"),
-            ]
-            # Create fake files so provenance check passes
-            for p in mock_download.return_value:
-                with open(p, "wb") as f:
-                    f.write(b"fake")
+        # Mock download to return fake file paths with correct hash names
+        mock_download.return_value = [
+            os.path.join(tmpdir, f"{HASH1}.jpg"),
+            os.path.join(tmpdir, f"{HASH2}.jpg"),
+        ]
+        # Create fake files so provenance check passes
+        for p in mock_download.return_value:
+            _touch(p)
 
-            saved, index_path = download_selected(entries, tmpdir, write_provenance_index=True)
+        saved, index_path = download_selected(entries, tmpdir, write_provenance_index=True)
 
-            self.assertEqual(len(saved), 2)
-            self.assertIsNotNone(index_path)
-            self.assertTrue(os.path.exists(index_path))  # type: ignore[arg-type]
+        self.assertEqual(len(saved), 2)
+        self.assertIsNotNone(index_path)
+        self.assertTrue(os.path.exists(index_path))  # type: ignore[arg-type]
 
-            with open(index_path, "r") as f:  # type: ignore[arg-type]
-                index_data = json.load(f)
+        index_data = json.loads(Path(index_path).read_bytes())  # type: ignore[arg-type]
 
-            self.assertIn("entries", index_data)
-            self.assertIn("total", index_data)
-            self.assertIn("generated_at", index_data)
+        self.assertGreaterEqual(index_data.keys(), {"entries", "total", "generated_at"})
 
     @patch("src.lib.topic_discovery.download_images_parallel")
     def test_download_selected_applies_filter(self, mock_download):
         """Test that domain filter is applied before download."""
-        entries = [
-            self._make_entry("https://good.com/img1.jpg"),
-            self._make_entry("https://spam.com/img2.jpg"),
-        ]
-        flt = DownloadFilter(deny_domains=["spam.com"])
+        entries = list(_ENTRIES_GOOD_SPAM)
+        flt = _DENY_SPAM
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            mock_download.return_value = []
+        tmpdir = self._tmpdir()
+        mock_download.return_value = []
 
-            download_selected(entries, tmpdir, download_filter=flt)
+        download_selected(entries, tmpdir, download_filter=flt)
 
-            # Check that only good.com was passed to download
-            call_args = mock_download.call_args
-            urls_passed = call_args[0][0]  # First positional arg
-            self.assertEqual(len(urls_passed), 1)
-            self.assertIn("good.com", urls_passed[0])
+        # Check that only good.com was passed to download
+        call_args = mock_download.call_args
+        urls_passed = call_args[0][0]  # First positional arg
+        self.assertEqual(set(urls_passed), {"https://good.com/img1.jpg"})
+        self.assertEqual(len(urls_passed), 1)
 
     def test_download_selected_empty_entries_still_writes_index(self):
         """Even with no entries, provenance_index.json should be created."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            saved, index_path = download_selected([], tmpdir, write_provenance_index=True)
+        tmpdir = self._tmpdir()
 
-            self.assertEqual(saved, [])
-            self.assertIsNotNone(index_path)
-            self.assertTrue(os.path.exists(index_path))  # type: ignore[arg-type]
+        saved, index_path = download_selected([], tmpdir, write_provenance_index=True)
 
-            with open(index_path, "r") as f:  # type: ignore[arg-type]
-                index_data = json.load(f)
+        self.assertEqual(saved, [])
+        self.assertIsNotNone(index_path)
+        self.assertTrue(os.path.exists(index_path))  # type: ignore[arg-type]
 
-            self.assertEqual(index_data["entries"], [])
-            self.assertEqual(index_data["total"], 0)
+        index_data = json.loads(Path(index_path).read_bytes())  # type: ignore[arg-type]
 
+        self.assertEqual(index_data["entries"], [])
+        self.assertEqual(index_data["total"], 0)
 
-class TestResolutionFilter(unittest.TestCase):
-    """Test resolution filtering (min_width/min_height) in download_selected."""
 
-    def _make_entry(self, image_url: str) -> ProvenanceEntry:
-        return ProvenanceEntry(
-            topic="test",
-            source_page_url="https://example.com/",  # type: ignore[arg-type]
-            image_url=image_url,  # type: ignore[arg-type]
-            discovery_method="SERP",
-        )
+class TestResolutionFilter(_TmpRootTestCase):
+    """Test resolution filtering (min_width/min_height) in download_selected."""
 
     @patch("src.lib.topic_discovery._check_image_resolution")
     @patch("src.lib.topic_discovery.download_images_parallel")
     def test_resolution_filter_removes_small_images(self, mock_download, mock_check):
         """Test that images not meeting resolution requirements are removed."""
-        import hashlib
-
-        url1 = "https://example.com/large.jpg"
-        url2 = "https://example.com/small.jpg"
-        entries = [
-            self._make_entry(url1),
-            self._make_entry(url2),
-        ]
+        entries = list(_ENTRIES_LARGE_SMALL)
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            hash1 = hashlib.sha256(url1.encode("utf-8")).hexdigest()[:16]
-            hash2 = hashlib.sha256(url2.encode("utf-8")).hexdigest()[:16]
-            file1 = os.path.join(tmpdir, f"{hash1}.jpg")
-            file2 = os.path.join(tmpdir, f"{hash2}.jpg")
+        tmpdir = self._tmpdir()
+        file1 = os.path.join(tmpdir, f"{HASH_LARGE}.jpg")
+        file2 = os.path.join(tmpdir, f"{HASH_SMALL}.jpg")
 
-            # Mock download returns both files
-            mock_download.return_value = [file1, file2]
+        # Mock download returns both files, created as stubs on disk
+        _touch(file1)
+        _touch(file2)
+        mock_download.return_value = [file1, file2]
 
-            # Create fake files
-            for p in [file1, file2]:
-                with open(p, "wb") as f:
-                    f.write(b"fake")
+        # Mock resolution check: large passes, small fails (checks may run concurrently)
+        mock_check.side_effect = lambda path, min_w, min_h: path == file1
 
-            # Mock resolution check: first passes, second fails
-            mock_check.side_effect = [True, False]
+        flt = _MIN_800X600
+        saved, index_path = download_selected(entries, tmpdir, download_filter=flt)
 
-            flt = DownloadFilter(min_width=800, min_height=600)
-            saved, index_path = download_selected(entries, tmpdir, download_filter=flt)
+        # Only large image should remain
+        self.assertEqual(len(saved), 1)
+        self.assertEqual(saved[0], file1)
 
-            # Only large image should remain
-            self.assertEqual(len(saved), 1)
-            self.assertEqual(saved[0], file1)
-
-            # Small image file should be removed
-            self.assertFalse(os.path.exists(file2))
+        # Small image file should be removed
+        self.assertTrue(os.path.exists(file1))
+        self.assertFalse(os.path.exists(file2))
 
     @patch("src.lib.topic_discovery.download_images_parallel")
     def test_no_resolution_filter_keeps_all(self, mock_download):
         """Test that without resolution filter, all images are kept."""
-        import hashlib
-
-        url1 = "https://example.com/img1.jpg"
-        entries = [self._make_entry(url1)]
+        entries = list(_ENTRIES_IMG12[:1])
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            hash1 = hashlib.sha256(url1.encode("utf-8")).hexdigest()[:16]
-            file1 = os.path.join(tmpdir, f"{hash1}.jpg")
+        tmpdir = self._tmpdir()
+        file1 = os.path.join(tmpdir, f"{HASH1}.jpg")
 
-            mock_download.return_value = [file1]
+        mock_download.return_value = [file1]
 
-            with open(file1, "wb") as f:
-                f.write(b"fake")
+        _touch(file1)
 
-            # No filter - should keep all
-            saved, _ = download_selected(entries, tmpdir)
-            self.assertEqual(len(saved), 1)
+        # No filter - should keep all
+        saved, _ = download_selected(entries, tmpdir)
+        self.assertEqual(len(saved), 1)
 
 
 if __name__ == "__main__":
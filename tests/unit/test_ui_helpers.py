@@ -1,29 +1,31 @@
-import json
+import math
 import os
 import tempfile
+import types
 import unittest
 from pathlib import Path
+from unittest import mock
 
+from src.lib import jsonio
 from src.lib.ui_helpers import (
     build_full_url,
+    config_mtime_ns,
     load_config,
     mask_headers,
+    parse_json_text,
     save_config,
     summarize_response,
     validate_json_text,
 )
 
+# Fixed response bodies, built once at import
+_JSON_BODY = '{"hello": "world"}'
+_BIG_BODY = "x" * 9000
+# Read-only so a mask_headers that mutated its input would fail loudly
+_MASK_INPUT = types.MappingProxyType({"Authorization": "Bearer 123", "X-Test": "ok", "Api-Key": "secret"})
 
-class TestUiHelpers(unittest.TestCase):
-    def setUp(self):
-        self._tmpdir = tempfile.TemporaryDirectory()
-        self.tmpdir = Path(self._tmpdir.name)
-        os.environ["IMAGE_SAVER_CONFIG_DIR"] = str(self.tmpdir)
-
-    def tearDown(self):
-        os.environ.pop("IMAGE_SAVER_CONFIG_DIR", None)
-        self._tmpdir.cleanup()
 
+class TestUiHelpers(unittest.TestCase):
     def test_空文字列を検証するとエラーなしで成功する(self):
         # Arrange
         text = ""
@@ -57,18 +59,89 @@ class TestUiHelpers(unittest.TestCase):
         self.assertFalse(ok)
         self.assertIsNotNone(err)
 
-    def test_機密情報を含むヘッダーがマスクされる(self):
+    def test_JSON文字列を検証と同時にパースできる(self):
+        # Act
+        ok, err, value = parse_json_text('{"a": [1, 2]}')
+        ok_empty, _, empty_value = parse_json_text("  ")
+        ok_bad, err_bad, bad_value = parse_json_text("{bad")
+
+        # Assert
+        self.assertEqual((ok, err, value), (True, None, {"a": [1, 2]}))
+        self.assertEqual((ok_empty, empty_value), (True, None))
+        self.assertFalse(ok_bad)
+        self.assertIsNotNone(err_bad)
+        self.assertIsNone(bad_value)
+
+    def test_先頭文字がJSONとしてありえない入力は不正と判定される(self):
+        # Act
+        ok, err, value = parse_json_text("  a: 1")
+        ok_scalar, _, scalar = parse_json_text(" -1.5 ")
+
+        # Assert
+        self.assertFalse(ok)
+        self.assertIsNotNone(err)
+        self.assertIsNone(value)
+        self.assertEqual((ok_scalar, scalar), (True, -1.5))
+        self.assertEqual(err, "Expecting value: line 1 column 3 (char 2)")
+
+    def test_NaNとInfinityは標準jsonと同様に受け付ける(self):
+        # Act
+        results = [parse_json_text(text) for text in ("NaN", "Infinity", "-Infinity")]
+
+        # Assert
+        self.assertTrue(all(ok for ok, _, _ in results))
+        self.assertTrue(math.isnan(results[0][2]))
+        self.assertEqual([value for _, _, value in results[1:]], [math.inf, -math.inf])
+
+    def test_orjsonの有無に関わらず同じ結果になる(self):
         # Arrange
-        headers = {"Authorization": "Bearer 123", "X-Test": "ok", "Api-Key": "secret"}
+        text = '{"a": [1, 2.5, "あ"], "big": 123456789012345678901234567890, "nan": NaN}'
 
         # Act
-        masked = mask_headers(headers)
+        with mock.patch.object(jsonio, "HAS_ORJSON", False):
+            ok_std, _, value_std = parse_json_text(text)
+        ok, _, value = parse_json_text(text)
+
+        # Assert
+        self.assertTrue(ok and ok_std)
+        self.assertEqual(value["a"], value_std["a"])
+        self.assertEqual(value["big"], 123456789012345678901234567890)
+
+    def test_JSON書き出しはorjsonの有無に関わらず同じ出力になる(self):
+        # Arrange
+        obj = {"a": [1, 2.5, "あ", None], "nested": {"nan": math.nan, "inf": [math.inf, -math.inf]}, 1: True}
+
+        # Act
+        with mock.patch.object(jsonio, "HAS_ORJSON", False):
+            expected = [jsonio.dumps(obj), jsonio.dumps(obj, indent=True)]
+        actual = [jsonio.dumps(obj), jsonio.dumps(obj, indent=True)]
+
+        # Assert
+        self.assertEqual(actual, expected)
+        self.assertIn('"nan":NaN', actual[0])
+
+    def test_機密情報を含むヘッダーがマスクされる(self):
+        # Act
+        masked = mask_headers(_MASK_INPUT)
 
         # Assert
         self.assertEqual(masked["Authorization"], "***")
         self.assertEqual(masked["Api-Key"], "***")
         self.assertEqual(masked["X-Test"], "ok")
 
+    def test_ヘッダー名の大文字小文字に関係なくマスクされる(self):
+        # Arrange
+        headers = {"X-ACCESS-TOKEN": "t", "set-cookie": "c", "X-Password-Hint": "p", "Accept": "*/*"}
+
+        # Act
+        masked = mask_headers(headers)
+
+        # Assert
+        self.assertEqual(
+            masked, {"X-ACCESS-TOKEN": "***", "set-cookie": "***", "X-Password-Hint": "***", "Accept": "*/*"}
+        )
+        self.assertEqual(mask_headers(None), {})
+
     def test_ベースURLとパスとクエリパラメータから完全なURLが構築される(self):
         # Arrange
         base_url = "https://example.com/"
@@ -79,25 +152,22 @@ class TestUiHelpers(unittest.TestCase):
         url = build_full_url(base_url, path, params)
 
         # Assert
-        self.assertTrue(url.startswith("https://example.com/api?"))
-        self.assertIn("q=x+y", url)
-        self.assertIn("tags=1", url)
-        self.assertIn("tags=2", url)
-
-    def test_設定を保存して読み込むと元の設定が復元される(self):
-        # Arrange
-        cfg = {"base_url": "http://localhost:8000", "recent": ["/healthz"]}
+        base, _, query = url.partition("?")
+        self.assertEqual(base, "https://example.com/api")
+        self.assertLessEqual({"q=x+y", "tags=1", "tags=2"}, set(query.split("&")))
 
+    def test_クエリが空または文字列のみの場合もURLが構築される(self):
         # Act
-        save_config(cfg)
-        loaded = load_config()
+        no_query = build_full_url("https://example.com/", "/healthz", {})
+        str_query = build_full_url("https://example.com", "search", {"q": "富士山", "lang": "ja"})
 
         # Assert
-        self.assertEqual(cfg, loaded)
+        self.assertEqual(no_query, "https://example.com/healthz")
+        self.assertEqual(str_query, "https://example.com/search?q=%E5%AF%8C%E5%A3%AB%E5%B1%B1&lang=ja")
 
     def test_JSONレスポンスがサマリーとして整形される(self):
         # Arrange
-        text = json.dumps({"hello": "world"})
+        text = _JSON_BODY
         status = 200
         elapsed_ms = 123
         content_type = "application/json"
@@ -112,7 +182,7 @@ class TestUiHelpers(unittest.TestCase):
 
     def test_大きなレスポンスボディがトランケートされる(self):
         # Arrange
-        big = "x" * 9000
+        big = _BIG_BODY
         status = 200
         elapsed_ms = 50
         content_type = "text/plain"
@@ -124,6 +194,108 @@ class TestUiHelpers(unittest.TestCase):
         self.assertEqual(summary["body_type"], "text")
         self.assertTrue(summary["body_preview"].endswith("(truncated)"))
 
+    def test_バイト列のレスポンスは先頭のみデコードされる(self):
+        # Arrange
+        body = "あ".encode("utf-8") + b"x" * 9000
+
+        # Act
+        summary = summarize_response(200, 10, body, "text/html; charset=utf-8")
+
+        # Assert
+        self.assertTrue(summary["body_preview"].startswith("あx"))
+        self.assertTrue(summary["body_preview"].endswith("(truncated)"))
+        self.assertEqual(summarize_response(200, 10, b'{"a": 1}', "application/json")["body_preview"], '{"a": 1}')
+
+    def test_バイト列のプレビューは文字数で切り詰められる(self):
+        # Arrange
+        body = ("あ" * 9000).encode("utf-8")
+
+        # Act
+        summary = summarize_response(200, 10, body, "text/plain")
+
+        # Assert
+        self.assertEqual(summary["body_preview"], "あ" * 8000 + "\n... (truncated)")
+
+    def test_指定したエンコーディングでプレビューがデコードされる(self):
+        # Arrange
+        body = "日本語".encode("shift_jis")
+
+        # Act
+        summary = summarize_response(200, 10, body, "text/html", encoding="shift_jis")
+
+        # Assert
+        self.assertEqual(summary["body_preview"], "日本語")
+
+    def test_不明なエンコーディングはUTF8にフォールバックする(self):
+        # Arrange
+        body = "日本語".encode("utf-8")
+
+        # Act
+        summary = summarize_response(200, 10, body, "text/html", encoding="x-bogus-charset")
+
+        # Assert
+        self.assertEqual(summary["body_preview"], "日本語")
+
+
+class TestUiConfigPersistence(unittest.TestCase):
+    """設定ファイルの保存・読み込み（実ファイルを使うテストだけ一時ディレクトリを用意する）"""
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmpdir = Path(self._tmpdir.name)
+        os.environ["IMAGE_SAVER_CONFIG_DIR"] = str(self.tmpdir)
+
+    def tearDown(self):
+        os.environ.pop("IMAGE_SAVER_CONFIG_DIR", None)
+        self._tmpdir.cleanup()
+
+    def test_設定を保存して読み込むと元の設定が復元される(self):
+        # Arrange
+        cfg = {"base_url": "http://localhost:8000", "recent": ["/healthz"]}
+
+        # Act
+        save_config(cfg)
+        loaded = load_config()
+
+        # Assert
+        self.assertEqual(cfg, loaded)
+
+    def test_内容が変わらない設定の保存ではファイルを書き換えない(self):
+        # Arrange
+        cfg = {"base_url": "http://localhost:8000"}
+        save_config(cfg)
+        path = self.tmpdir / "ui_config.json"
+        os.utime(path, ns=(0, 0))
+
+        # Act
+        save_config(dict(cfg))
+
+        # Assert
+        self.assertEqual(path.stat().st_mtime_ns, 0)
+        self.assertFalse(path.with_suffix(".tmp").exists())
+
+    def test_設定ファイルの更新時刻で変更を検知できる(self):
+        # Arrange
+        self.assertEqual(config_mtime_ns(), 0)  # ファイルなし
+        save_config({"base_url": "http://localhost:8000"})
+        os.utime(self.tmpdir / "ui_config.json", ns=(1, 1))
+
+        # Act
+        save_config({"base_url": "http://localhost:9000"})
+
+        # Assert
+        self.assertNotIn(config_mtime_ns(), (0, 1))
+
+    def test_内容が変わった設定は上書き保存される(self):
+        # Arrange
+        save_config({"base_url": "http://localhost:8000"})
+
+        # Act
+        save_config({"base_url": "http://localhost:9000"})
+
+        # Assert
+        self.assertEqual(load_config(), {"base_url": "http://localhost:9000"})
+
 
 if __name__ == "__main__":
     unittest.main()